@@ -8,6 +8,8 @@ from .models import (
     ShoppingList,
     Tag,
 )
+from .search import search_condition
+from .shopping_list import schedule_recipe_carts_bump
 
 
 class TagAdmin(admin.ModelAdmin):
@@ -23,6 +25,23 @@ class RecipeAdmin(admin.ModelAdmin):
     inlines = (RecipeIngredientInline,)
     search_fields = ["name", "author__username", "tags__name"]
 
+    def get_search_results(self, request, queryset, search_term):
+        # The full-text match over name, ingredients and description is
+        # added to the usual icontains lookups.
+        results, use_distinct = super().get_search_results(
+            request, queryset, search_term
+        )
+        if search_term:
+            results |= queryset.filter(
+                search_condition(search_term, queryset.db)
+            )
+        return results, use_distinct
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        if change:
+            schedule_recipe_carts_bump(form.instance.pk)
+
 
 class IngredientAdmin(admin.ModelAdmin):
     search_fields = ["name"]
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = "api"
+
+    def ready(self):
+        from backend import db  # noqa: F401
+
+        from . import signals  # noqa: F401
@@ -0,0 +1,72 @@
+from django.db.models import Case, CharField, F, IntegerField, Sum, Value, When
+
+from .models import IngredientAmount, ShoppingList
+
+# Units summed together, as (base unit, how many base units in one).
+UNIT_FACTORS = {
+    "г": ("г", 1),
+    "кг": ("г", 1000),
+    "мл": ("мл", 1),
+    "л": ("мл", 1000),
+}
+# Totals of at least this many base units are shown in the larger unit.
+DISPLAY_UNITS = {
+    "г": ("кг", 1000),
+    "мл": ("л", 1000),
+}
+BASE_UNITS = {unit: base for unit, (base, _) in UNIT_FACTORS.items()}
+FACTORS = {unit: factor for unit, (_, factor) in UNIT_FACTORS.items()}
+
+
+def _by_unit(values, default, output_field):
+    return Case(
+        *(
+            When(ingredient__measurement_unit=unit, then=Value(value))
+            for unit, value in values.items()
+        ),
+        default=default,
+        output_field=output_field,
+    )
+
+
+def aggregate_cart(user):
+    """Sum the ingredients of every recipe in the user's shopping cart.
+
+    One GROUP BY over IngredientAmount, restricted to the cart's recipes
+    with a subquery, so no row is multiplied by an unrelated join.
+    """
+    rows = (
+        IngredientAmount.objects.filter(
+            recipe_id__in=ShoppingList.objects.filter(user=user).values(
+                "recipe_id"
+            )
+        )
+        .values(
+            name=F("ingredient__name"),
+            unit=_by_unit(
+                BASE_UNITS, F("ingredient__measurement_unit"), CharField()
+            ),
+        )
+        .annotate(
+            total=Sum(
+                F("amount") * _by_unit(FACTORS, Value(1), IntegerField())
+            )
+        )
+        .order_by("name", "unit")
+    )
+    items = []
+    for row in rows:
+        unit, amount = to_display_unit(row["unit"], row["total"])
+        items.append(
+            {"name": row["name"], "measurement_unit": unit, "amount": amount}
+        )
+    return items
+
+
+def to_display_unit(unit, amount):
+    if unit in DISPLAY_UNITS:
+        larger, factor = DISPLAY_UNITS[unit]
+        if amount >= factor:
+            whole, rest = divmod(amount, factor)
+            return larger, whole if not rest else round(amount / factor, 3)
+    return unit, amount
@@ -8,3 +8,18 @@ IS_IN_SHOPING_CART_VALUES = {
     "true": True,
     "false": False,
 }
+
+
+RECIPE_ORDERINGS = {
+    "new": ("-pub_date",),
+    "popular": ("-favorites_count", "-pub_date"),
+}
+
+
+RECIPE_ORDERING_CHOICES = (
+    ("new", "Сначала новые"),
+    ("popular", "Сначала популярные"),
+)
+
+
+BULK_RECIPES_LIMIT = 100
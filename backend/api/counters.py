@@ -0,0 +1,25 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from users.models import Follow
+from .models import Favorite, Recipe, User
+
+
+def count_related(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .values(field)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def recount_counters():
+    Recipe.objects.update(favorites_count=count_related(Favorite, "recipe"))
+    User.objects.update(
+        recipes_count=count_related(Recipe, "author"),
+        followers_count=count_related(Follow, "follower"),
+    )
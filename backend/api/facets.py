@@ -0,0 +1,106 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django_filters.utils import translate_validation
+
+from .filters import RecipeFilter, get_tag_ids_by_slug
+from .models import Recipe
+from .versioning import RECIPES_VERSION, TAGS_VERSION, get_version
+
+FACETS_KEY = "recipe-facets:{recipes}:{tags}:{digest}"
+FACETS = ("tags", "authors")
+DEFAULT_FACETS = ("tags",)
+AUTHOR_FACETS_LIMIT = 20
+# Parameters that change the counts; paging and ordering do not.
+FILTER_PARAMS = (
+    "author",
+    "tags",
+    "is_favorited",
+    "is_in_shopping_cart",
+    "search",
+)
+USER_PARAMS = ("is_favorited", "is_in_shopping_cart")
+
+
+def get_facet_names(request):
+    names = request.query_params.get("facets")
+    if not names:
+        return DEFAULT_FACETS
+    return tuple(name for name in FACETS if name in names.split(","))
+
+
+def filter_recipes(queryset, request, exclude):
+    # Each facet ignores its own filter, so the counts show what toggling
+    # one more tag or author would match.
+    params = request.query_params.copy()
+    for name in set(params) - set(FILTER_PARAMS) | {exclude}:
+        params.pop(name, None)
+    filterset = RecipeFilter(params, queryset=queryset, request=request)
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+    return filterset.qs.order_by()
+
+
+def count_tags(queryset, request):
+    recipes = filter_recipes(queryset, request, "tags")
+    counts = dict(
+        Recipe.tags.through.objects.filter(recipe__in=recipes.values("pk"))
+        .values("tag_id")
+        .annotate(count=Count("recipe_id"))
+        .values_list("tag_id", "count")
+    )
+    return [
+        {"id": tag_id, "slug": slug, "count": counts.get(tag_id, 0)}
+        for slug, tag_ids in get_tag_ids_by_slug().items()
+        for tag_id in tag_ids
+    ]
+
+
+def count_authors(queryset, request):
+    recipes = filter_recipes(queryset, request, "author")
+    return [
+        {"id": author_id, "username": username, "count": count}
+        for author_id, username, count in recipes.values(
+            "author_id", "author__username"
+        )
+        .annotate(count=Count("id"))
+        .order_by("-count", "author_id")
+        .values_list("author_id", "author__username", "count")[
+            :AUTHOR_FACETS_LIMIT
+        ]
+    ]
+
+
+COUNTERS = {"tags": count_tags, "authors": count_authors}
+
+
+def get_facets(queryset, request):
+    names = get_facet_names(request)
+
+    def build():
+        return {name: COUNTERS[name](queryset, request) for name in names}
+
+    params = request.query_params
+    if any(params.get(name) for name in USER_PARAMS):
+        # Depends on the user's favorites and cart, which are not versioned
+        # per user; one GROUP BY query is cheap enough to run every time.
+        return build()
+    digest = hashlib.md5(
+        urlencode(
+            sorted(
+                (name, value)
+                for name in FILTER_PARAMS
+                for value in params.getlist(name)
+            )
+            + [("facets", ",".join(names))]
+        ).encode()
+    ).hexdigest()
+    key = FACETS_KEY.format(
+        recipes=get_version(RECIPES_VERSION),
+        tags=get_version(TAGS_VERSION),
+        digest=digest,
+    )
+    return cache.get_or_set(key, build, settings.RECIPE_FACETS_CACHE_TIMEOUT)
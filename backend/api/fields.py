@@ -0,0 +1,95 @@
+import base64
+import binascii
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image
+from rest_framework import serializers
+
+BASE64_MARKER = ";base64,"
+# A multiple of 4 characters, so every chunk decodes on its own.
+CHUNK_CHARS = 64 * 1024
+IMAGE_FORMATS = {"JPEG": "jpg", "PNG": "png", "GIF": "gif", "WEBP": "webp"}
+
+
+def decoded_size(data, start):
+    padding = data.count("=", len(data) - 2)
+    return (len(data) - start) * 3 // 4 - padding
+
+
+class Base64ImageField(serializers.ImageField):
+    """Decodes a base64 image into a spooled file chunk by chunk.
+
+    Unlike drf_extra_fields' field it never holds the decoded bytes or a
+    decoded Pillow image in memory: the size is checked from the length
+    of the string, and the format and dimensions come from Pillow's lazy
+    header parsing.
+    """
+
+    default_error_messages = {
+        "invalid": "Загрузите изображение в формате base64",
+        "invalid_image": "Файл не является изображением",
+        "max_size": "Размер изображения не должен превышать {max_size} байт",
+        "max_dimension": (
+            "Стороны изображения не должны превышать {max_dimension} px"
+        ),
+    }
+
+    def __init__(self, *args, **kwargs):
+        self.max_size = kwargs.pop("max_size", settings.RECIPE_IMAGE_MAX_SIZE)
+        self.max_dimension = kwargs.pop(
+            "max_dimension", settings.RECIPE_IMAGE_MAX_DIMENSION
+        )
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str) or not data:
+            self.fail("invalid")
+        marker = data.find(BASE64_MARKER, 0, 256)
+        start = 0 if marker == -1 else marker + len(BASE64_MARKER)
+        if decoded_size(data, start) > self.max_size:
+            self.fail("max_size", max_size=self.max_size)
+
+        file = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        try:
+            for offset in range(start, len(data), CHUNK_CHARS):
+                file.write(
+                    base64.b64decode(
+                        data[offset:offset + CHUNK_CHARS], validate=True
+                    )
+                )
+            image_format = self.inspect(file)
+        except (binascii.Error, ValueError):
+            file.close()
+            self.fail("invalid")
+        except serializers.ValidationError:
+            file.close()
+            raise
+        size = file.seek(0, 2)
+        file.seek(0)
+        return UploadedFile(
+            file=file,
+            name=f"{uuid.uuid4()}.{IMAGE_FORMATS[image_format]}",
+            content_type=Image.MIME[image_format],
+            size=size,
+        )
+
+    def inspect(self, file):
+        file.seek(0)
+        try:
+            with Image.open(file) as image:
+                image_format = image.format
+                width, height = image.size
+                # Checks the structure without decoding the pixels.
+                image.verify()
+        except (OSError, SyntaxError, Image.DecompressionBombError):
+            self.fail("invalid_image")
+        if image_format not in IMAGE_FORMATS:
+            self.fail("invalid_image")
+        if max(width, height) > self.max_dimension:
+            self.fail("max_dimension", max_dimension=self.max_dimension)
+        return image_format
@@ -1,30 +1,83 @@
 import django_filters
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
 
-from .models import Ingredient, Recipe
+from .constants import RECIPE_ORDERING_CHOICES, RECIPE_ORDERINGS
+from .models import Ingredient, Recipe, Tag
+from .search import search_recipes
+from .versioning import TAGS_VERSION, get_version
+
+TAG_IDS_KEY = "tag-ids:{version}"
+
+
+def _build_tag_ids_by_slug():
+    # slug is not unique: every tag sharing a slug matches it.
+    tag_ids = {}
+    for slug, tag_id in Tag.objects.order_by("id").values_list("slug", "id"):
+        tag_ids.setdefault(slug, []).append(tag_id)
+    return tag_ids
+
+
+def get_tag_ids_by_slug():
+    return cache.get_or_set(
+        TAG_IDS_KEY.format(version=get_version(TAGS_VERSION)),
+        _build_tag_ids_by_slug,
+        settings.REFERENCE_CACHE_TIMEOUT,
+    )
+
+
+def get_tag_choices():
+    return [(slug, slug) for slug in get_tag_ids_by_slug()]
 
 
 class RecipeFilter(django_filters.FilterSet):
     author = django_filters.NumberFilter()
-    tags = django_filters.AllValuesMultipleFilter(field_name="tags__slug")
+    tags = django_filters.MultipleChoiceFilter(
+        choices=get_tag_choices, method="get_tags"
+    )
     is_favorited = django_filters.BooleanFilter(method="get_is_favorited")
     is_in_shopping_cart = django_filters.BooleanFilter(
         method="get_is_in_shopping_cart"
     )
+    search = django_filters.CharFilter(method="get_search")
+    ordering = django_filters.ChoiceFilter(
+        choices=RECIPE_ORDERING_CHOICES, method="get_ordering"
+    )
 
     class Meta:
         model = Recipe
         fields = ("author", "tags")
 
+    def get_tags(self, queryset, name, value):
+        tag_ids = get_tag_ids_by_slug()
+        return queryset.filter(
+            Exists(
+                Recipe.tags.through.objects.filter(
+                    recipe=OuterRef("pk"),
+                    tag_id__in=[
+                        tag_id for slug in value for tag_id in tag_ids[slug]
+                    ],
+                )
+            )
+        )
+
     def get_is_favorited(self, queryset, name, value):
         if value:
-            return queryset.filter(in_favorites__user=self.request.user)
+            return queryset.filter(is_favorited=True)
         return queryset
 
     def get_is_in_shopping_cart(self, queryset, name, value):
         if value:
-            return queryset.filter(shopping_list__user=self.request.user)
+            return queryset.filter(is_in_shopping_cart=True)
         return queryset
 
+    def get_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
+
+    def get_ordering(self, queryset, name, value):
+        return queryset.order_by(*RECIPE_ORDERINGS[value])
+
 
 class IngredientFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(lookup_expr="istartswith")
@@ -0,0 +1,90 @@
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps, features
+
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+SIZES = {
+    "thumbnail": (360, 360),
+    "medium": (1080, 1080),
+}
+if features.check("webp"):
+    FORMAT, EXTENSION, SAVE_OPTIONS = "WEBP", "webp", {"quality": 80}
+else:
+    FORMAT, EXTENSION, SAVE_OPTIONS = "JPEG", "jpg", {
+        "quality": 82,
+        "optimize": True,
+        "progressive": True,
+    }
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+    thread_name_prefix="recipe-images",
+)
+
+
+def derivative_name(name, size):
+    return f"{os.path.splitext(os.path.basename(name))[0]}.{size}.{EXTENSION}"
+
+
+def encode(image, size):
+    derivative = image.copy()
+    derivative.thumbnail(SIZES[size], Image.LANCZOS)
+    if FORMAT == "JPEG" and derivative.mode != "RGB":
+        derivative = derivative.convert("RGB")
+    buffer = io.BytesIO()
+    derivative.save(buffer, FORMAT, **SAVE_OPTIONS)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_derivatives(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is None or not recipe.image:
+        return
+    source = recipe.image.name
+    with recipe.image.open("rb") as f, Image.open(f) as image:
+        image.load()
+        # Phone photos are stored sideways with an EXIF Orientation tag,
+        # which the re-encoded derivatives would lose.
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.mode else "RGB")
+        derivatives = {}
+        for size in SIZES:
+            field = getattr(recipe, f"image_{size}")
+            field.save(
+                derivative_name(source, size), encode(image, size), save=False
+            )
+            derivatives[f"image_{size}"] = field.name
+    # A newer upload may have replaced the image while this one was encoded.
+    Recipe.objects.filter(pk=recipe_id, image=source).update(**derivatives)
+
+
+def _run(recipe_id):
+    try:
+        generate_derivatives(recipe_id)
+    except Exception:
+        logger.exception("Image derivatives failed for recipe %s", recipe_id)
+    finally:
+        connections.close_all()
+
+
+def schedule_derivatives(recipe_id):
+    transaction.on_commit(lambda: _executor.submit(_run, recipe_id))
+
+
+def image_url(recipe, size=None, request=None):
+    image = (size and getattr(recipe, f"image_{size}")) or recipe.image
+    if not image:
+        return None
+    if request is not None:
+        return request.build_absolute_uri(image.url)
+    return image.url
@@ -0,0 +1,80 @@
+import bisect
+import threading
+
+from django.conf import settings
+from django.db.models import Case, IntegerField, Value, When
+
+from .models import Ingredient
+from .versioning import INGREDIENTS_VERSION, bump_version, get_version
+
+FIELDS = ("id", "name", "measurement_unit")
+
+
+def search_ingredients_db(query, limit):
+    return list(
+        Ingredient.objects.filter(name__icontains=query)
+        .annotate(
+            rank=Case(
+                When(name__istartswith=query, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("rank", "name", "measurement_unit")
+        .values(*FIELDS)[:limit]
+    )
+
+
+class IngredientIndex:
+    # Sorted in-process copy of the ingredient catalog. Its version lives
+    # in the Django cache so every worker notices catalog writes.
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._version = None
+        self._data = ([], [], False)
+
+    def _build(self, version):
+        oversized = Ingredient.objects.count() > self.max_size
+        rows = [] if oversized else list(Ingredient.objects.values(*FIELDS))
+        rows.sort(key=lambda row: (row["name"].lower(), row["id"]))
+        keys = [row["name"].lower() for row in rows]
+        self._data = (keys, rows, oversized)
+        self._version = version
+
+    def _ensure_fresh(self):
+        version = get_version(INGREDIENTS_VERSION)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._build(version)
+
+    def invalidate(self):
+        self._version = None
+        bump_version(INGREDIENTS_VERSION)
+
+    def search(self, query, limit):
+        self._ensure_fresh()
+        keys, rows, oversized = self._data
+        if oversized:
+            return search_ingredients_db(query, limit)
+        query = query.lower()
+        result = []
+        position = bisect.bisect_left(keys, query)
+        while (
+            position < len(keys)
+            and len(result) < limit
+            and keys[position].startswith(query)
+        ):
+            result.append(rows[position])
+            position += 1
+        for key, row in zip(keys, rows):
+            if len(result) >= limit:
+                break
+            if query in key and not key.startswith(query):
+                result.append(row)
+        return result
+
+
+ingredient_index = IngredientIndex(settings.INGREDIENT_INDEX_MAX_SIZE)
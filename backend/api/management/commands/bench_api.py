@@ -0,0 +1,142 @@
+import itertools
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from api.models import Recipe, Tag
+from users.models import Follow, User
+
+from .generate_data import USERNAME_PREFIX
+
+RECIPE_FILTERS = ("author", "tags", "is_favorited", "is_in_shopping_cart")
+INGREDIENT_QUERIES = ("м", "мо", "мол", "молоко", "сыр")
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    index = min(len(values) - 1, round(fraction * (len(values) - 1)))
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = "Benchmark hot API endpoints against the synthetic dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--limit", type=int, default=6)
+        parser.add_argument(
+            "--cold",
+            action="store_true",
+            help="Clear the cache before every request",
+        )
+        parser.add_argument("--output", help="Write the JSON report here")
+
+    def handle(self, *args, **options):
+        user = (
+            User.objects.filter(
+                username__startswith=USERNAME_PREFIX,
+                follower__isnull=False,
+            )
+            .order_by("id")
+            .first()
+        )
+        if user is None:
+            raise CommandError("Run generate_data first")
+        self.repeat = options["repeat"]
+        self.cold = options["cold"]
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+        report = {}
+        # One client repeating every scenario would soon be throttled, and
+        # the fast 429s would pass for latency.
+        unthrottled = override_settings(
+            REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK,
+                "DEFAULT_THROTTLE_RATES": {},
+            }
+        )
+        for name, path in self.scenarios(user, options["limit"]):
+            with unthrottled:
+                report[name] = self.measure(name, path)
+            self.stdout.write(
+                f"{name:<60} p50 {report[name]['p50_ms']:8.1f} ms  "
+                f"p95 {report[name]['p95_ms']:8.1f} ms  "
+                f"queries {report[name]['queries']}"
+            )
+
+        result = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(result)
+        else:
+            self.stdout.write(result)
+
+    def scenarios(self, user, limit):
+        author = Follow.objects.filter(user=user).values_list(
+            "follower_id", flat=True
+        ).first()
+        tags = list(Tag.objects.values_list("slug", flat=True)[:2])
+        values = {
+            "author": f"author={author}",
+            "tags": "&".join(f"tags={slug}" for slug in tags),
+            "is_favorited": "is_favorited=true",
+            "is_in_shopping_cart": "is_in_shopping_cart=true",
+        }
+        for size in range(len(RECIPE_FILTERS) + 1):
+            for names in itertools.combinations(RECIPE_FILTERS, size):
+                query = "&".join(
+                    [f"limit={limit}"] + [values[name] for name in names]
+                )
+                yield (
+                    f"recipes.list[{','.join(names) or 'all'}]",
+                    f"/api/recipes/?{query}",
+                )
+        recipe = Recipe.objects.order_by("-pub_date").first()
+        yield "recipes.retrieve", f"/api/recipes/{recipe.id}/"
+        yield (
+            "users.subscriptions",
+            f"/api/users/subscriptions/?limit={limit}&recipes_limit=3",
+        )
+        for file_format in ("pdf", "txt", "csv"):
+            yield (
+                f"recipes.download_shopping_cart[{file_format}]",
+                "/api/recipes/download_shopping_cart/"
+                f"?format={file_format}",
+            )
+        for query in INGREDIENT_QUERIES:
+            yield (
+                f"ingredients.search[{query}]",
+                f"/api/ingredients/?name={query}",
+            )
+
+    def measure(self, name, path):
+        timings = []
+        queries = []
+        for _ in range(self.repeat):
+            if self.cold:
+                cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = self.client.get(path)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(context.captured_queries))
+            if response.status_code != 200:
+                raise CommandError(
+                    f"{name}: {path} returned {response.status_code}"
+                )
+        return {
+            "path": path,
+            "status": response.status_code,
+            "p50_ms": round(percentile(timings, 0.5), 2),
+            "p95_ms": round(percentile(timings, 0.95), 2),
+            "queries": max(queries),
+        }
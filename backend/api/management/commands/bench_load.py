@@ -0,0 +1,113 @@
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Recipe
+from users.models import User
+
+from .bench_api import percentile
+from .generate_data import PASSWORD, USERNAME_PREFIX
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the read endpoints of a running server, to compare "
+        "the WSGI and ASGI serving modes on the synthetic dataset"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--output", help="Write the JSON report here")
+
+    def handle(self, *args, **options):
+        # One synthetic user per concurrent client: the per-user throttle
+        # buckets (DEFAULT_THROTTLE_RATES) would otherwise reject most of
+        # the requests of a single user.
+        users = list(
+            User.objects.filter(username__startswith=USERNAME_PREFIX)
+            .order_by("id")[: options["concurrency"]]
+        )
+        recipe = Recipe.objects.order_by("-pub_date").first()
+        if not users or recipe is None:
+            raise CommandError("Run generate_data first")
+        self.url = options["url"].rstrip("/")
+        self.sessions = []
+        for user in users:
+            session = requests.Session()
+            session.headers["Authorization"] = f"Token {self.login(user)}"
+            self.sessions.append(session)
+
+        paths = {
+            "recipes.list": "/api/recipes/?limit=6",
+            "recipes.retrieve": f"/api/recipes/{recipe.id}/",
+            "tags.list": "/api/tags/",
+            "ingredients.search": "/api/ingredients/?name=мол",
+        }
+        report = {}
+        for name, path in paths.items():
+            report[name] = self.load(
+                path, options["concurrency"], options["requests"]
+            )
+            self.stdout.write(
+                f"{name:<20} {report[name]['rps']:8.1f} req/s  "
+                f"p50 {report[name]['p50_ms']:8.1f} ms  "
+                f"p95 {report[name]['p95_ms']:8.1f} ms  "
+                f"errors {report[name]['errors']}"
+            )
+
+        result = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(result)
+        else:
+            self.stdout.write(result)
+        # Rejected requests are fast and would pass for throughput.
+        failed = [name for name, stats in report.items() if stats["errors"]]
+        if failed:
+            raise CommandError(
+                f"Requests failed in {', '.join(failed)}, see statuses"
+            )
+
+    def login(self, user):
+        response = requests.post(
+            f"{self.url}/api/auth/token/login/",
+            json={"email": user.email, "password": PASSWORD},
+        )
+        if response.status_code != 200:
+            raise CommandError(f"Login failed: {response.text}")
+        return response.json()["auth_token"]
+
+    def request(self, number, path):
+        session = self.sessions[number % len(self.sessions)]
+        started = time.perf_counter()
+        try:
+            status = session.get(f"{self.url}{path}").status_code
+        except requests.RequestException:
+            status = "error"
+        return (time.perf_counter() - started) * 1000, status
+
+    def load(self, path, concurrency, count):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            results = list(
+                executor.map(self.request, range(count), [path] * count)
+            )
+        elapsed = time.perf_counter() - started
+        timings = [timing for timing, _ in results]
+        statuses = Counter(str(status) for _, status in results)
+        return {
+            "path": path,
+            "concurrency": concurrency,
+            "requests": count,
+            "rps": round(count / elapsed, 1),
+            "p50_ms": round(percentile(timings, 0.5), 2),
+            "p95_ms": round(percentile(timings, 0.95), 2),
+            "errors": count - statuses["200"],
+            "statuses": dict(statuses),
+        }
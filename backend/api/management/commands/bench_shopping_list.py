@@ -0,0 +1,108 @@
+import resource
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from fpdf import FPDF
+
+from api.cart import aggregate_cart
+from api.models import Ingredient, IngredientAmount, Recipe, ShoppingList
+from api.shopping_list import FONT_PATH, FORMATS
+
+User = get_user_model()
+
+
+def render_pdf_legacy(items):
+    # The pre-streaming implementation, kept for comparison.
+    pdf = FPDF()
+    pdf.add_font("DejaVu", "", FONT_PATH, uni=True)
+    pdf.set_font("DejaVu", "", 14)
+    pdf.add_page()
+    for item in items:
+        text = (
+            f"{item['name']} ({item['measurement_unit']}) - {item['amount']}"
+        )
+        pdf.cell(0, 10, txt=text, ln=1)
+    yield pdf.output(dest="S").encode("latin1")
+
+
+class Command(BaseCommand):
+    help = "Benchmark shopping list rendering for a synthetic cart"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipes", type=int, default=200)
+        parser.add_argument("--ingredients", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.make_cart(options["recipes"], options["ingredients"])
+            renderers = {"pdf-legacy": render_pdf_legacy}
+            renderers.update(
+                (name, renderer) for name, (renderer, _) in FORMATS.items()
+            )
+            for name, renderer in renderers.items():
+                self.run(name, renderer, user, options["repeat"])
+            transaction.set_rollback(True)
+
+    def make_cart(self, recipes_count, ingredients_count):
+        user = User.objects.create(
+            email="bench-shopping-list@example.com",
+            username="bench-shopping-list",
+        )
+        if not Ingredient.objects.exists():
+            Ingredient.objects.bulk_create(
+                Ingredient(name=f"Ингредиент {i}", measurement_unit="г")
+                for i in range(ingredients_count * 5)
+            )
+        ingredients = list(Ingredient.objects.all()[:ingredients_count * 5])
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=user,
+                name=f"Рецепт {i}",
+                image="bench.png",
+                text="Описание",
+                cooking_time=10,
+            )
+            for i in range(recipes_count)
+        )
+        recipes = list(Recipe.objects.filter(author=user))
+        IngredientAmount.objects.bulk_create(
+            IngredientAmount(
+                recipe=recipe,
+                ingredient=ingredients[(i + j) % len(ingredients)],
+                amount=j + 1,
+            )
+            for i, recipe in enumerate(recipes)
+            for j in range(ingredients_count)
+        )
+        ShoppingList.objects.bulk_create(
+            ShoppingList(user=user, recipe=recipe) for recipe in recipes
+        )
+        return user
+
+    def run(self, name, renderer, user, repeat):
+        timings = []
+        peak = 0
+        size = 0
+        for _ in range(repeat):
+            tracemalloc.start()
+            started = time.perf_counter()
+            size = sum(
+                len(chunk) for chunk in renderer(aggregate_cart(user))
+            )
+            timings.append(time.perf_counter() - started)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        timings.sort()
+        self.stdout.write(
+            f"{name:<11} median {timings[len(timings) // 2] * 1000:8.1f} ms"
+            f"  peak heap {peak / 1024:8.0f} KiB"
+            f"  max rss {self.max_rss():8.0f} KiB"
+            f"  size {size / 1024:6.0f} KiB"
+        )
+
+    def max_rss(self):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
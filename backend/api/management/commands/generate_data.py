@@ -0,0 +1,186 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.counters import recount_counters
+from api.models import (
+    Favorite,
+    Ingredient,
+    IngredientAmount,
+    Recipe,
+    ShoppingList,
+    Tag,
+)
+from api.search import update_search_vectors
+from users.models import Follow
+
+User = get_user_model()
+
+USERNAME_PREFIX = "synthetic"
+PASSWORD = "synthetic-password"
+TAGS = (
+    ("Завтрак", "#E26C2D", "breakfast"),
+    ("Обед", "#49B64E", "lunch"),
+    ("Ужин", "#8775D2", "dinner"),
+)
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic dataset for benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--recipes", type=int, default=1000)
+        parser.add_argument("--ingredients-per-recipe", type=int, default=8)
+        parser.add_argument("--follows", type=int, default=10)
+        parser.add_argument("--favorites", type=int, default=20)
+        parser.add_argument("--cart", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        if not Ingredient.objects.exists():
+            call_command("load_data", stdout=self.stdout)
+
+        with transaction.atomic():
+            users = self.create_users(options["users"])
+            tags = self.create_tags()
+            recipes = self.create_recipes(users, options["recipes"])
+            self.add_tags(recipes, tags)
+            self.add_ingredients(recipes, options["ingredients_per_recipe"])
+            self.add_relations(
+                Follow,
+                "user",
+                "follower",
+                users,
+                users,
+                options["follows"],
+            )
+            self.add_relations(
+                Favorite,
+                "user",
+                "recipe",
+                users,
+                recipes,
+                options["favorites"],
+            )
+            self.add_relations(
+                ShoppingList,
+                "user",
+                "recipe",
+                users,
+                recipes,
+                options["cart"],
+            )
+            recount_counters()
+            update_search_vectors(*(recipe.id for recipe in recipes))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {len(users)} users and {len(recipes)} recipes "
+                f"in {time.monotonic() - started:.2f}s"
+            )
+        )
+
+    def create_users(self, count):
+        offset = User.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).count()
+        password = make_password(PASSWORD)
+        names = [
+            f"{USERNAME_PREFIX}{number}"
+            for number in range(offset, offset + count)
+        ]
+        User.objects.bulk_create(
+            (
+                User(
+                    email=f"{name}@example.com",
+                    username=name,
+                    first_name=name,
+                    last_name=name,
+                    password=password,
+                )
+                for name in names
+            ),
+            batch_size=self.batch_size,
+        )
+        return list(User.objects.filter(username__in=names))
+
+    def create_tags(self):
+        for name, color, slug in TAGS:
+            Tag.objects.get_or_create(
+                slug=slug, defaults={"name": name, "color": color}
+            )
+        return list(Tag.objects.all())
+
+    def create_recipes(self, users, count):
+        last_id = Recipe.objects.order_by("-id").values_list(
+            "id", flat=True
+        ).first() or 0
+        Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    author=self.random.choice(users),
+                    name=f"Рецепт {number}",
+                    image="recipes/synthetic.png",
+                    text="Синтетический рецепт для нагрузочных тестов",
+                    cooking_time=self.random.randint(5, 180),
+                )
+                for number in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        return list(Recipe.objects.filter(id__gt=last_id, author__in=users))
+
+    def add_tags(self, recipes, tags):
+        RecipeTag = Recipe.tags.through
+        RecipeTag.objects.bulk_create(
+            (
+                RecipeTag(recipe_id=recipe.id, tag_id=tag.id)
+                for recipe in recipes
+                for tag in self.random.sample(
+                    tags, self.random.randint(1, len(tags))
+                )
+            ),
+            batch_size=self.batch_size,
+        )
+
+    def add_ingredients(self, recipes, per_recipe):
+        ingredient_ids = list(Ingredient.objects.values_list("id", flat=True))
+        per_recipe = min(per_recipe, len(ingredient_ids))
+        IngredientAmount.objects.bulk_create(
+            (
+                IngredientAmount(
+                    recipe_id=recipe.id,
+                    ingredient_id=ingredient_id,
+                    amount=self.random.randint(1, 500),
+                )
+                for recipe in recipes
+                for ingredient_id in self.random.sample(
+                    ingredient_ids, per_recipe
+                )
+            ),
+            batch_size=self.batch_size,
+        )
+
+    def add_relations(self, model, owner, target, owners, targets, per_owner):
+        model.objects.bulk_create(
+            (
+                model(**{owner: owner_object, target: target_object})
+                for owner_object in owners
+                for target_object in self.random.sample(
+                    targets, min(per_owner, len(targets))
+                )
+                if target_object != owner_object
+            ),
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
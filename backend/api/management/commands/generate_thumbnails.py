@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from api.images import generate_derivatives
+from api.models import Recipe
+
+
+class Command(BaseCommand):
+    help = "Build thumbnail and medium images for recipes missing them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild derivatives for every recipe",
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image="")
+        if not options["all"]:
+            recipes = recipes.filter(image_thumbnail="")
+        done = 0
+        for recipe_id in recipes.values_list("id", flat=True).iterator():
+            try:
+                generate_derivatives(recipe_id)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f"Recipe {recipe_id}: {error}")
+                continue
+            done += 1
+        self.stdout.write(self.style.SUCCESS(f"Processed {done} recipes"))
@@ -1,18 +1,130 @@
 import csv
+import io
+import json
+import os
+import time
+from itertools import islice
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 
+from api.ingredient_index import ingredient_index
 from api.models import Ingredient
 
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    "data",
+    "ingredients.csv",
+)
+
+
+def read_csv(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if row:
+                yield row[0], row[1]
+
+
+def read_json(path):
+    # The JSON catalog is a single array, so it is parsed in one go.
+    with open(path, encoding="utf-8") as f:
+        for item in json.load(f):
+            yield item["name"], item["measurement_unit"]
+
+
+READERS = {
+    ".csv": read_csv,
+    ".json": read_json,
+}
+
+
+def dedupe(rows):
+    seen = set()
+    for name, unit in rows:
+        key = (name.strip(), unit.strip())
+        if key[0] and key not in seen:
+            seen.add(key)
+            yield key
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    batch = list(islice(rows, size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, size))
+
 
 class Command(BaseCommand):
     help = "Load ingredients data to DB"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=DEFAULT_PATH)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Use COPY through a temporary table on PostgreSQL",
+        )
+
     def handle(self, *args, **options):
-        with open("api/data/ingredients.csv", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            for row in reader:
-                name, unit = row
-                Ingredient.objects.get_or_create(
-                    name=name, measurement_unit=unit
-                )
+        path = options["path"]
+        reader = READERS.get(os.path.splitext(path)[1].lower())
+        if reader is None:
+            raise CommandError(
+                f"Unsupported file type, expected: {', '.join(READERS)}"
+            )
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+        use_copy = options["copy"] and connection.vendor == "postgresql"
+        load = self.load_copy if use_copy else self.load_bulk
+
+        started = time.monotonic()
+        with transaction.atomic():
+            before = Ingredient.objects.count()
+            total = 0
+            for batch in batches(dedupe(reader(path)), options["batch_size"]):
+                load(batch)
+                total += len(batch)
+            inserted = Ingredient.objects.count() - before
+        if inserted:
+            ingredient_index.invalidate()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Inserted {inserted}, skipped {total - inserted} "
+                f"in {time.monotonic() - started:.2f}s"
+            )
+        )
+
+    def load_bulk(self, batch):
+        Ingredient.objects.bulk_create(
+            (
+                Ingredient(name=name, measurement_unit=unit)
+                for name, unit in batch
+            ),
+            ignore_conflicts=True,
+        )
+
+    def load_copy(self, batch):
+        table = Ingredient._meta.db_table
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(batch)
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS ingredient_import "
+                "(name varchar(100), measurement_unit varchar(20)) "
+                "ON COMMIT DROP"
+            )
+            cursor.execute("TRUNCATE ingredient_import")
+            cursor.copy_expert(
+                "COPY ingredient_import (name, measurement_unit) "
+                "FROM STDIN WITH CSV",
+                buffer,
+            )
+            cursor.execute(
+                f"INSERT INTO {table} (name, measurement_unit) "
+                "SELECT name, measurement_unit FROM ingredient_import "
+                "ON CONFLICT ON CONSTRAINT unique_ingredient DO NOTHING"
+            )
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.counters import recount_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute favorites, recipes and followers counters"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        with transaction.atomic():
+            recount_counters()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Counters recomputed in {time.monotonic() - started:.2f}s"
+            )
+        )
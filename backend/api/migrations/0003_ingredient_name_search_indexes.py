@@ -0,0 +1,38 @@
+from django.db import migrations
+
+CREATE_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS api_ingredient_name_prefix_idx "
+    "ON api_ingredient (UPPER(name) text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS api_ingredient_name_trgm_idx "
+    "ON api_ingredient USING gin (UPPER(name) gin_trgm_ops)",
+]
+
+DROP_INDEXES = [
+    "DROP INDEX IF EXISTS api_ingredient_name_trgm_idx",
+    "DROP INDEX IF EXISTS api_ingredient_name_prefix_idx",
+]
+
+
+def run_on_postgresql(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_postgresql(CREATE_INDEXES),
+            run_on_postgresql(DROP_INDEXES),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.9 on 2026-10-18 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_recipe_feed_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tag',
+            name='slug',
+            field=models.CharField(db_index=True, max_length=20, verbose_name='slug'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.2.9 on 2026-10-18 02:44
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+CREATE_INDEX = [
+    "CREATE INDEX IF NOT EXISTS api_recipe_search_vector_idx "
+    "ON api_recipe USING gin (search_vector)",
+    "UPDATE api_recipe SET search_vector = "
+    "setweight(to_tsvector('russian', COALESCE(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', COALESCE(("
+    "SELECT string_agg(api_ingredient.name, ' ') "
+    "FROM api_ingredientamount "
+    "JOIN api_ingredient "
+    "ON api_ingredient.id = api_ingredientamount.ingredient_id "
+    "WHERE api_ingredientamount.recipe_id = api_recipe.id"
+    "), '')), 'B') || "
+    "setweight(to_tsvector('russian', COALESCE(text, '')), 'C')",
+]
+
+DROP_INDEX = [
+    "DROP INDEX IF EXISTS api_recipe_search_vector_idx",
+]
+
+
+def run_on_postgresql(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_recipe_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(
+            run_on_postgresql(CREATE_INDEX),
+            run_on_postgresql(DROP_INDEX),
+        ),
+    ]
@@ -1,5 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import BooleanField, Exists, OuterRef, Prefetch, Value
+
+from users.models import CounterFieldsMixin
+from users.utils import annotate_subscribed
 
 User = get_user_model()
 
@@ -39,6 +44,7 @@ class Tag(models.Model):
     )
     slug = models.CharField(
         max_length=20,
+        db_index=True,
         verbose_name="slug",
     )
 
@@ -50,7 +56,43 @@ class Tag(models.Model):
         return self.name
 
 
-class Recipe(models.Model):
+class RecipeQuerySet(models.QuerySet):
+    def with_user_flags(self, user):
+        if user.is_anonymous:
+            return self.annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(False, output_field=BooleanField()),
+            )
+        return self.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef("pk"))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingList.objects.filter(user=user, recipe=OuterRef("pk"))
+            ),
+        )
+
+    def for_read(self, user):
+        return (
+            self.with_user_flags(user)
+            .defer("search_vector")
+            .prefetch_related(
+                Prefetch(
+                    "author",
+                    queryset=annotate_subscribed(User.objects.all(), user),
+                ),
+                "tags",
+                Prefetch(
+                    "amount_ingredients",
+                    queryset=IngredientAmount.objects.select_related(
+                        "ingredient"
+                    ),
+                ),
+            )
+        )
+
+
+class Recipe(CounterFieldsMixin, models.Model):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -66,6 +108,18 @@ class Recipe(models.Model):
         verbose_name="Изображение",
         unique=False,
     )
+    image_thumbnail = models.ImageField(
+        upload_to=r"recipes/%Y/%m/%d/",
+        verbose_name="Миниатюра",
+        blank=True,
+        editable=False,
+    )
+    image_medium = models.ImageField(
+        upload_to=r"recipes/%Y/%m/%d/",
+        verbose_name="Изображение для страницы рецепта",
+        blank=True,
+        editable=False,
+    )
     text = models.TextField(verbose_name="Описание рецепта")
     ingredients = models.ManyToManyField(
         Ingredient,
@@ -84,9 +138,32 @@ class Recipe(models.Model):
     pub_date = models.DateTimeField(
         verbose_name="Дата публикации", auto_now_add=True
     )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="В избранном",
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name="Поисковый вектор",
+    )
+
+    objects = RecipeQuerySet.as_manager()
+    counter_fields = ("favorites_count",)
 
     class Meta:
         ordering = ["-pub_date"]
+        indexes = [
+            models.Index(
+                fields=["-favorites_count", "-pub_date"],
+                name="recipe_popular_idx",
+            ),
+            models.Index(
+                fields=["-pub_date", "-id"],
+                name="recipe_feed_idx",
+            ),
+        ]
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
 
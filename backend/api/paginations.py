@@ -1,7 +1,90 @@
+import base64
+import binascii
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class Pagination(PageNumberPagination):
     page_size = 6
     max_page_size = 999
     page_size_query_param = "limit"
+    cursor_query_param = "cursor"
+    keyset_ordering = ("-pub_date", "-id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_keyset(queryset, request)
+
+    def paginate_keyset(self, queryset, request):
+        # Seeks past the last (pub_date, id) seen instead of using OFFSET,
+        # and skips the COUNT(*) query of page-number pagination.
+        if tuple(queryset.query.order_by) not in (
+            (),
+            self.keyset_ordering[:1],
+            self.keyset_ordering,
+        ):
+            raise ValidationError(
+                {"cursor": "Курсор доступен только для сортировки по дате"}
+            )
+        self.request = request
+        cursor = request.query_params[self.cursor_query_param]
+        queryset = queryset.order_by(*self.keyset_ordering)
+        if cursor:
+            pub_date, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )
+        page_size = self.get_page_size(request)
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        self.page = page[:page_size]
+        return self.page
+
+    def decode_cursor(self, cursor):
+        try:
+            pub_date, pk = (
+                base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            )
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound("Invalid cursor")
+        if pub_date is None:
+            raise NotFound("Invalid cursor")
+        return pub_date, pk
+
+    def encode_cursor(self, recipe):
+        position = f"{recipe.pub_date.isoformat()}|{recipe.pk}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.page[-1]),
+        )
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", None),
+                    ("results", data),
+                ]
+            )
+        )
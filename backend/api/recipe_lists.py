@@ -0,0 +1,86 @@
+import contextvars
+from contextlib import contextmanager
+
+from .counters import count_related
+from .models import Favorite, Recipe, ShoppingList
+from .shopping_list import bump_cart_version
+
+ADDED = "added"
+EXISTS = "exists"
+REMOVED = "removed"
+ABSENT = "absent"
+NOT_FOUND = "not_found"
+
+_in_batch = contextvars.ContextVar("recipe_lists_batch", default=False)
+
+
+@contextmanager
+def batch():
+    # The receivers in api/signals.py skip rows changed inside, so a batch
+    # calls lists_changed once for all of them instead of once per row.
+    token = _in_batch.set(True)
+    try:
+        yield
+    finally:
+        _in_batch.reset(token)
+
+
+def in_batch():
+    return _in_batch.get()
+
+
+def lists_changed(model, user_id, recipe_ids):
+    # The only place that keeps favorites_count and the cart version in
+    # step with Favorite and ShoppingList rows: called by the receivers in
+    # api/signals.py for single rows and once per batch by add_recipes and
+    # remove_recipes.
+    if not recipe_ids:
+        return
+    if model is Favorite:
+        Recipe.objects.filter(pk__in=recipe_ids).update(
+            favorites_count=count_related(Favorite, "recipe")
+        )
+    elif model is ShoppingList:
+        bump_cart_version(user_id)
+
+
+def add_recipes(model, user, recipe_ids):
+    found = set(
+        Recipe.objects.filter(pk__in=recipe_ids).values_list("pk", flat=True)
+    )
+    present = set(
+        model.objects.filter(user=user, recipe_id__in=found).values_list(
+            "recipe_id", flat=True
+        )
+    )
+    new = found - present
+    # A concurrent request may insert the same rows first: the unique
+    # constraint turns that into a no-op instead of an IntegrityError.
+    model.objects.bulk_create(
+        (model(user=user, recipe_id=recipe_id) for recipe_id in new),
+        ignore_conflicts=True,
+    )
+    lists_changed(model, user.id, new)
+    return {
+        recipe_id: (
+            ADDED
+            if recipe_id in new
+            else EXISTS
+            if recipe_id in found
+            else NOT_FOUND
+        )
+        for recipe_id in recipe_ids
+    }
+
+
+def remove_recipes(model, user, recipe_ids):
+    rows = model.objects.filter(user=user, recipe_id__in=recipe_ids)
+    present = set(rows.values_list("recipe_id", flat=True))
+    if present:
+        with batch():
+            rows.delete()
+        lists_changed(model, user.id, present)
+    return {
+        recipe_id: REMOVED if recipe_id in present else ABSENT
+        for recipe_id in recipe_ids
+    }
@@ -0,0 +1,52 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from .versioning import get_version
+
+RESPONSE_KEY = "reference:{name}:{version}:{path}"
+
+
+class CachedReadMixin:
+    # Serves list and retrieve as pre-rendered JSON bytes. ``cache_name``
+    # names the version bumped by the model signals in ``api.signals``.
+    cache_name = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, super().retrieve, *args, **kwargs
+        )
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        key = RESPONSE_KEY.format(
+            name=self.cache_name,
+            version=get_version(self.cache_name),
+            path=hashlib.md5(request.get_full_path().encode()).hexdigest(),
+        )
+        cached = cache.get(key)
+        if cached is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            body = JSONRenderer().render(response.data)
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            cached = (etag, body)
+            cache.set(key, cached, settings.REFERENCE_CACHE_TIMEOUT)
+        etag, body = cached
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = (
+            f"public, max-age={settings.REFERENCE_CACHE_MAX_AGE}"
+        )
+        return response
@@ -0,0 +1,92 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connections, transaction
+from django.db.models import Case, Exists, F, OuterRef, Q, Subquery, When
+
+from .models import IngredientAmount, Recipe
+
+SEARCH_CONFIG = "russian"
+
+
+def uses_search_vector(using):
+    # SQLite, used for local runs, has no tsvector: search falls back to
+    # icontains over the same fields, in the same order of importance.
+    return connections[using].vendor == "postgresql"
+
+
+def search_vector():
+    ingredient_names = (
+        IngredientAmount.objects.filter(recipe=OuterRef("pk"))
+        .values("recipe")
+        .annotate(names=StringAgg("ingredient__name", " "))
+        .values("names")
+    )
+    return (
+        SearchVector("name", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(
+            Subquery(ingredient_names), weight="B", config=SEARCH_CONFIG
+        )
+        + SearchVector("text", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(*recipe_ids):
+    recipes = Recipe.objects.all()
+    if not uses_search_vector(recipes.db):
+        return
+    if recipe_ids:
+        recipes = recipes.filter(pk__in=recipe_ids)
+    recipes.update(search_vector=search_vector())
+
+
+def schedule_search_update(recipe_id):
+    # Ingredients are written after the recipe row, in the same
+    # transaction, so the vector is built once everything is committed.
+    transaction.on_commit(lambda: update_search_vectors(recipe_id))
+
+
+def in_ingredients(value):
+    return Exists(
+        IngredientAmount.objects.filter(
+            recipe=OuterRef("pk"), ingredient__name__icontains=value
+        )
+    )
+
+
+def search_condition(value, using="default"):
+    if uses_search_vector(using):
+        return Q(
+            search_vector=SearchQuery(
+                value, config=SEARCH_CONFIG, search_type="websearch"
+            )
+        )
+    return (
+        Q(name__icontains=value)
+        | Q(in_ingredients(value))
+        | Q(text__icontains=value)
+    )
+
+
+def search_rank(value, using="default"):
+    if uses_search_vector(using):
+        return SearchRank(
+            F("search_vector"),
+            SearchQuery(value, config=SEARCH_CONFIG, search_type="websearch"),
+        )
+    return Case(
+        When(name__icontains=value, then=3),
+        When(in_ingredients(value), then=2),
+        default=1,
+    )
+
+
+def search_recipes(queryset, value):
+    return (
+        queryset.filter(search_condition(value, queryset.db))
+        .annotate(search_rank=search_rank(value, queryset.db))
+        .order_by("-search_rank", "-pub_date")
+    )
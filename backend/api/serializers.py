@@ -1,13 +1,16 @@
 from django.db import transaction
 from django.shortcuts import get_list_or_404
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
 from users.models import Follow
 from users.serializers import UserRecipeSerializer
+from .constants import BULK_RECIPES_LIMIT
+from .fields import Base64ImageField
+from .images import image_url, schedule_derivatives
 from .models import Ingredient, IngredientAmount, Recipe, Tag, User
-from .utlils import ingredient_creaton
+from .shopping_list import schedule_recipe_carts_bump
+from .utlils import ingredient_creaton, ingredient_update
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -68,7 +71,8 @@ class RecipeSerializer(serializers.ModelSerializer):
     author = UserRecipeSerializer(read_only=True, required=False)
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
-    image = Base64ImageField()
+    image = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -79,13 +83,30 @@ class RecipeSerializer(serializers.ModelSerializer):
             "ingredients",
             "is_favorited",
             "is_in_shopping_cart",
+            "favorites_count",
             "image",
+            "images",
             "name",
             "text",
             "cooking_time",
         )
 
+    def get_image(self, recipe):
+        view = self.context.get("view")
+        size = "thumbnail" if view and view.action == "list" else "medium"
+        return image_url(recipe, size, self.context.get("request"))
+
+    def get_images(self, recipe):
+        request = self.context.get("request")
+        return {
+            "original": image_url(recipe, request=request),
+            "medium": image_url(recipe, "medium", request),
+            "thumbnail": image_url(recipe, "thumbnail", request),
+        }
+
     def get_is_favorited(self, current_recipe):
+        if hasattr(current_recipe, "is_favorited"):
+            return current_recipe.is_favorited
         request = self.context.get("request")
         return (
             str(request.user) != "AnonymousUser"
@@ -95,6 +116,8 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
 
     def get_is_in_shopping_cart(self, current_recipe):
+        if hasattr(current_recipe, "is_in_shopping_cart"):
+            return current_recipe.is_in_shopping_cart
         request = self.context.get("request")
         return (
             str(request.user) != "AnonymousUser"
@@ -134,6 +157,12 @@ class RecipeCreateUpdateSerializer(RecipeSerializer):
                 )
             else:
                 unique.append(item["id"])
+        missing = set(unique) - Ingredient.objects.in_bulk(unique).keys()
+        if missing:
+            raise serializers.ValidationError(
+                "Ингредиенты не найдены: "
+                + ", ".join(str(pk) for pk in sorted(missing))
+            )
         return value
 
     def validate_tags(self, value):
@@ -167,6 +196,7 @@ class RecipeCreateUpdateSerializer(RecipeSerializer):
                 recipe, ingredients=validated_data["ingredients"]
             )
             recipe.tags.set(tags)
+            schedule_derivatives(recipe.id)
 
         return recipe
 
@@ -179,15 +209,26 @@ class RecipeCreateUpdateSerializer(RecipeSerializer):
 
             ingredients = validated_data.pop("ingredients", None)
             if ingredients:
-                recipe.amount_ingredients.all().delete()
-                ingredient_creaton(recipe, ingredients)
+                ingredient_update(recipe, ingredients)
+                schedule_recipe_carts_bump(recipe.id)
+
+            if "image" in validated_data:
+                recipe.image_thumbnail = ""
+                recipe.image_medium = ""
+                schedule_derivatives(recipe.id)
 
             super().update(recipe, validated_data)
         return recipe
 
+    def to_representation(self, recipe):
+        recipe = Recipe.objects.for_read(self.context["request"].user).get(
+            pk=recipe.pk
+        )
+        return RecipeSerializer(recipe, context=self.context).data
+
 
 class RecipeForListSerializer(serializers.ModelSerializer):
-    image = Base64ImageField()
+    image = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -198,6 +239,35 @@ class RecipeForListSerializer(serializers.ModelSerializer):
             "cooking_time",
         )
 
+    def get_image(self, recipe):
+        return image_url(recipe, "thumbnail", self.context.get("request"))
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    add = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        max_length=BULK_RECIPES_LIMIT,
+        default=list,
+    )
+    remove = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        max_length=BULK_RECIPES_LIMIT,
+        default=list,
+    )
+
+    def validate(self, data):
+        if not data["add"] and not data["remove"]:
+            raise serializers.ValidationError("Передайте add или remove")
+        both = set(data["add"]) & set(data["remove"])
+        if both:
+            raise serializers.ValidationError(
+                "Рецепты нельзя одновременно добавить и удалить: "
+                + ", ".join(str(pk) for pk in sorted(both))
+            )
+        data["add"] = list(dict.fromkeys(data["add"]))
+        data["remove"] = list(dict.fromkeys(data["remove"]))
+        return data
+
 
 class FollowSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
@@ -0,0 +1,168 @@
+import csv
+import os
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags
+from fpdf import FPDF
+from rest_framework.negotiation import DefaultContentNegotiation
+
+from .cart import aggregate_cart
+from .models import ShoppingList
+from .versioning import bump_version, get_version
+
+FONT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "fonts",
+    "DejaVuSansCondensed.ttf",
+)
+FONT_FAMILY = "DejaVu"
+FONT_SIZE = 14
+CHUNK_SIZE = 64 * 1024
+
+CART_VERSION_NAME = "shopping-cart:{user_id}"
+DOCUMENT_KEY = "shopping-list:{user_id}:{version}:{file_format}"
+SUMMARY_KEY = "shopping-list:{user_id}:{version}"
+
+_font_lock = threading.Lock()
+_font = None
+
+
+def _iter_rows(items):
+    for item in items:
+        yield item["name"], item["measurement_unit"], item["amount"]
+
+
+def _load_font():
+    # FPDF parses the TTF metrics on every add_font call, so the parsed
+    # font is kept per process and copied into each new document.
+    global _font
+    with _font_lock:
+        if _font is None:
+            pdf = FPDF()
+            pdf.add_font(FONT_FAMILY, "", FONT_PATH, uni=True)
+            fontkey = FONT_FAMILY.lower()
+            font = pdf.fonts[fontkey]
+            font["ttffile"] = FONT_PATH
+            _font = (fontkey, font, pdf.font_files)
+    return _font
+
+
+class ShoppingListPDF(FPDF):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fontkey, font, font_files = _load_font()
+        self.fonts[fontkey] = dict(font, subset=list(font["subset"]))
+        for name, info in font_files.items():
+            self.font_files[name] = dict(info)
+        self.set_font(FONT_FAMILY, "", FONT_SIZE)
+
+
+def render_pdf(items):
+    pdf = ShoppingListPDF()
+    pdf.add_page()
+    for name, measurement_unit, amount in _iter_rows(items):
+        pdf.cell(0, 10, txt=f"{name} ({measurement_unit}) - {amount}", ln=1)
+    document = pdf.output(dest="S").encode("latin1")
+    for start in range(0, len(document), CHUNK_SIZE):
+        yield document[start:start + CHUNK_SIZE]
+
+
+def render_text(items):
+    for name, measurement_unit, amount in _iter_rows(items):
+        yield f"{name} ({measurement_unit}) - {amount}\n".encode("utf-8")
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def render_csv(items):
+    writer = csv.writer(_Echo())
+    yield "\ufeff".encode("utf-8")
+    yield writer.writerow(
+        ("name", "measurement_unit", "amount")
+    ).encode("utf-8")
+    for row in _iter_rows(items):
+        yield writer.writerow(row).encode("utf-8")
+
+
+FORMATS = {
+    "pdf": (render_pdf, "application/pdf"),
+    "txt": (render_text, "text/plain; charset=utf-8"),
+    "csv": (render_csv, "text/csv; charset=utf-8"),
+}
+DEFAULT_FORMAT = "pdf"
+
+
+def get_cart_version(user_id):
+    return get_version(CART_VERSION_NAME.format(user_id=user_id))
+
+
+def bump_cart_version(*user_ids):
+    bump_version(
+        *(CART_VERSION_NAME.format(user_id=user_id) for user_id in user_ids)
+    )
+
+
+def bump_recipe_carts(*recipe_ids):
+    user_ids = set(
+        ShoppingList.objects.filter(recipe_id__in=recipe_ids).values_list(
+            "user_id", flat=True
+        )
+    )
+    if user_ids:
+        bump_cart_version(*user_ids)
+
+
+def schedule_recipe_carts_bump(*recipe_ids):
+    # A download between an early bump and the commit would cache the old
+    # aggregate under the new version until SHOPPING_LIST_CACHE_TIMEOUT.
+    transaction.on_commit(lambda: bump_recipe_carts(*recipe_ids))
+
+
+def get_cart_summary(user, version):
+    return cache.get_or_set(
+        SUMMARY_KEY.format(user_id=user.id, version=version),
+        lambda: aggregate_cart(user),
+        settings.SHOPPING_LIST_CACHE_TIMEOUT,
+    )
+
+
+def get_etag(version, file_format):
+    # Weak: a re-render after eviction carries a new PDF creation date.
+    return f'W/"{version}-{file_format}"'
+
+
+def etag_matches(etag, if_none_match):
+    tags = [tag.lstrip("W/") for tag in parse_etags(if_none_match or "")]
+    return "*" in tags or etag.lstrip("W/") in tags
+
+
+def render_cached(user, version, file_format):
+    key = DOCUMENT_KEY.format(
+        user_id=user.id, version=version, file_format=file_format
+    )
+    document = cache.get(key)
+    if document is not None:
+        return iter([document])
+    renderer, _ = FORMATS[file_format]
+    return _store_chunks(key, renderer(get_cart_summary(user, version)))
+
+
+def _store_chunks(key, chunks):
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    cache.set(key, b"".join(parts), settings.SHOPPING_LIST_CACHE_TIMEOUT)
+
+
+class FormatParamNegotiation(DefaultContentNegotiation):
+    # The download action uses the ``format`` query parameter to pick the
+    # document type, so DRF must not treat it as a renderer override.
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
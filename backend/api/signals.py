@@ -0,0 +1,75 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from users.utils import change_counter
+from .ingredient_index import ingredient_index
+from .models import Favorite, Ingredient, Recipe, ShoppingList, Tag, User
+from .recipe_lists import in_batch, lists_changed
+from .search import schedule_search_update, update_search_vectors
+from .shopping_list import schedule_recipe_carts_bump
+from .versioning import RECIPES_VERSION, TAGS_VERSION, bump_version
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_changed(sender, instance, created, **kwargs):
+    if not created:
+        recipe_ids = list(
+            instance.amount_ingredients.values_list("recipe_id", flat=True)
+        )
+        if recipe_ids:
+            schedule_recipe_carts_bump(*recipe_ids)
+            update_search_vectors(*recipe_ids)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_catalog_changed(sender, **kwargs):
+    ingredient_index.invalidate()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, **kwargs):
+    bump_version(TAGS_VERSION)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingList)
+def recipe_list_saved(sender, instance, created, **kwargs):
+    if created and not in_batch():
+        lists_changed(sender, instance.user_id, [instance.recipe_id])
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingList)
+def recipe_list_deleted(sender, instance, **kwargs):
+    if not in_batch():
+        lists_changed(sender, instance.user_id, [instance.recipe_id])
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(
+            User.objects.filter(pk=instance.author_id), "recipes_count", 1
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    change_counter(
+        User.objects.filter(pk=instance.author_id), "recipes_count", -1
+    )
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_changed(sender, **kwargs):
+    if kwargs.get("action", "post_").startswith("post_"):
+        bump_version(RECIPES_VERSION)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, **kwargs):
+    schedule_search_update(instance.pk)
@@ -0,0 +1,332 @@
+import base64
+import io
+import os
+import shutil
+import tempfile
+import tracemalloc
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+from rest_framework import serializers, status
+from rest_framework.test import APITestCase
+
+from users.models import Follow, User
+from .fields import Base64ImageField
+from .images import generate_derivatives
+from .models import (
+    Favorite,
+    Ingredient,
+    IngredientAmount,
+    Recipe,
+    ShoppingList,
+    Tag,
+)
+
+RECIPES = 12
+BATCH = 50
+MiB = 1024 * 1024
+
+
+def encode_png(width, height, noise=False):
+    if noise:
+        # Random pixels barely compress, so the PNG stays large.
+        image = Image.frombytes(
+            "RGB", (width, height), os.urandom(width * height * 3)
+        )
+    else:
+        image = Image.new("RGB", (width, height), "white")
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def to_data_uri(content):
+    return "data:image/png;base64," + base64.b64encode(content).decode()
+
+
+def create_user(name):
+    return User.objects.create_user(
+        email=f"{name}@example.com",
+        username=name,
+        first_name=name,
+        last_name=name,
+        password="password",
+    )
+
+
+class RecipeQueryCountTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user("reader")
+        authors = [create_user(f"author{number}") for number in range(3)]
+        tags = [
+            Tag.objects.create(name=slug, color="#000000", slug=slug)
+            for slug in ("breakfast", "lunch")
+        ]
+        ingredients = [
+            Ingredient.objects.create(name=name, measurement_unit="г")
+            for name in ("мука", "сахар", "соль")
+        ]
+        for number in range(RECIPES):
+            recipe = Recipe.objects.create(
+                author=authors[number % len(authors)],
+                name=f"Recipe {number}",
+                image="recipes/recipe.png",
+                text="Text",
+                cooking_time=10,
+            )
+            recipe.tags.set(tags)
+            IngredientAmount.objects.bulk_create(
+                IngredientAmount(
+                    recipe=recipe, ingredient=ingredient, amount=100
+                )
+                for ingredient in ingredients
+            )
+            if number % 2:
+                Favorite.objects.create(user=cls.user, recipe=recipe)
+            if number % 3:
+                ShoppingList.objects.create(user=cls.user, recipe=recipe)
+        Follow.objects.create(user=cls.user, follower=authors[0])
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_page_cost(self, expected):
+        for limit in (2, RECIPES):
+            with self.subTest(limit=limit):
+                with self.assertNumQueries(expected):
+                    response = self.client.get(f"/api/recipes/?limit={limit}")
+                self.assertEqual(len(response.data["results"]), limit)
+
+    def test_anonymous_page_cost_is_constant(self):
+        # COUNT, the page with its flags, and the prefetched authors, tags
+        # and ingredients with their amounts.
+        self.assert_page_cost(5)
+
+    def test_authenticated_page_cost_is_constant(self):
+        self.client.force_authenticate(self.user)
+        self.assert_page_cost(5)
+
+    def test_authenticated_flags(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(f"/api/recipes/?limit={RECIPES}")
+        flags = {
+            recipe["name"]: (
+                recipe["is_favorited"],
+                recipe["is_in_shopping_cart"],
+                recipe["author"]["is_subscribed"],
+                recipe["favorites_count"],
+            )
+            for recipe in response.data["results"]
+        }
+        for number in range(RECIPES):
+            self.assertEqual(
+                flags[f"Recipe {number}"],
+                (
+                    bool(number % 2),
+                    bool(number % 3),
+                    number % 3 == 0,
+                    number % 2,
+                ),
+            )
+
+    def test_retrieve_query_count(self):
+        recipe = Recipe.objects.first()
+        for authenticated in (False, True):
+            if authenticated:
+                self.client.force_authenticate(self.user)
+            with self.subTest(authenticated=authenticated):
+                # The recipe, then its author, tags and ingredients.
+                with self.assertNumQueries(4):
+                    response = self.client.get(f"/api/recipes/{recipe.id}/")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_response_query_count(self):
+        self.client.force_authenticate(self.user)
+        recipe = Recipe.objects.exclude(
+            in_favorites__user=self.user
+        ).exclude(shopping_list__user=self.user)[0]
+        # The recipe, get_or_create's SELECT and INSERT inside a SAVEPOINT
+        # pair, plus the favorites_count recount for favorites; the cart
+        # version lives in the cache.
+        for endpoint, expected in (("favorite", 6), ("shopping_cart", 5)):
+            with self.subTest(endpoint=endpoint):
+                with self.assertNumQueries(expected):
+                    response = self.client.get(
+                        f"/api/recipes/{recipe.id}/{endpoint}/"
+                    )
+                self.assertEqual(
+                    response.status_code, status.HTTP_201_CREATED
+                )
+
+
+class RecipeTagFilterTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = create_user("author")
+        # Tag.slug is not unique, so two tags may share one.
+        cls.breakfasts = [
+            Tag.objects.create(name=name, color="#000000", slug="breakfast")
+            for name in ("Завтрак", "Утро")
+        ]
+        for number in range(4):
+            recipe = Recipe.objects.create(
+                author=author,
+                name=f"Recipe {number}",
+                image="recipes/recipe.png",
+                text="Text",
+                cooking_time=10,
+            )
+            recipe.tags.set([cls.breakfasts[number % 2]])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_slug_matches_every_tag_sharing_it(self):
+        response = self.client.get("/api/recipes/?tags=breakfast")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 4)
+
+    def test_facets_count_every_tag_sharing_a_slug(self):
+        response = self.client.get("/api/recipes/facets/")
+        self.assertEqual(
+            response.data["tags"],
+            [
+                {"id": tag.id, "slug": "breakfast", "count": 2}
+                for tag in self.breakfasts
+            ],
+        )
+
+
+class RecipeListBatchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user("reader")
+        author = create_user("author")
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=author,
+                name=f"Recipe {number}",
+                image="recipes/recipe.png",
+                text="Text",
+                cooking_time=10,
+            )
+            for number in range(BATCH)
+        )
+        cls.recipe_ids = list(Recipe.objects.values_list("id", flat=True))
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def post_batch(self, action, expected_queries):
+        with self.assertNumQueries(expected_queries):
+            response = self.client.post(
+                "/api/recipes/favorite/",
+                {action: self.recipe_ids},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def favorites_counts(self):
+        return set(Recipe.objects.values_list("favorites_count", flat=True))
+
+    def test_batch_query_counts_do_not_grow(self):
+        # The recipes, the existing rows, the INSERT and one recount.
+        self.post_batch("add", 4)
+        self.assertEqual(self.favorites_counts(), {1})
+        # The existing rows, the rows collected for delete(), the DELETE
+        # and one recount.
+        self.post_batch("remove", 4)
+        self.assertEqual(self.favorites_counts(), {0})
+        self.assertFalse(Favorite.objects.exists())
+
+
+class Base64ImageFieldTests(SimpleTestCase):
+    def decode(self, data, **kwargs):
+        field = Base64ImageField(**kwargs)
+        tracemalloc.start()
+        try:
+            result = field.to_internal_value(data)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return result, peak
+
+    def assert_rejected(self, code, data, **kwargs):
+        with self.assertRaises(serializers.ValidationError) as context:
+            self.decode(data, **kwargs)
+        self.assertEqual(context.exception.get_codes(), [code])
+
+    def test_large_png_peak_memory(self):
+        content = encode_png(1600, 1600, noise=True)
+        self.assertGreater(len(content), 7 * MiB)
+        upload, peak = self.decode(to_data_uri(content), max_size=16 * MiB)
+        # The data URI itself is allocated before tracing starts; decoding
+        # adds one chunk plus the in-memory part of the spooled file.
+        self.assertLess(peak, 4 * MiB)
+        self.assertEqual(upload.size, len(content))
+        self.assertEqual(upload.content_type, "image/png")
+        self.assertEqual(upload.read(), content)
+
+    def test_oversize_is_rejected_before_decoding(self):
+        data = to_data_uri(encode_png(1600, 1600, noise=True))
+        with self.assertRaises(serializers.ValidationError) as context:
+            tracemalloc.start()
+            try:
+                Base64ImageField(max_size=MiB).to_internal_value(data)
+            finally:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+        self.assertEqual(context.exception.get_codes(), ["max_size"])
+        self.assertLess(peak, 64 * 1024)
+
+    def test_dimensions_over_the_limit(self):
+        self.assert_rejected(
+            "max_dimension",
+            to_data_uri(encode_png(200, 10)),
+            max_dimension=100,
+        )
+
+    def test_not_an_image(self):
+        self.assert_rejected("invalid_image", to_data_uri(b"not an image"))
+
+    def test_invalid_base64(self):
+        self.assert_rejected("invalid", "data:image/png;base64,@@@@")
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_exif_orientation_is_applied(self):
+        # A 200x100 landscape sensor image tagged "rotate 90° clockwise",
+        # as phones store portrait photos.
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        buffer = io.BytesIO()
+        Image.new("RGB", (200, 100), "white").save(
+            buffer, "JPEG", exif=exif.tobytes()
+        )
+        recipe = Recipe(
+            author=create_user("author"),
+            name="Recipe",
+            text="Text",
+            cooking_time=10,
+        )
+        recipe.image.save(
+            "photo.jpg", ContentFile(buffer.getvalue()), save=False
+        )
+        recipe.save()
+
+        generate_derivatives(recipe.id)
+
+        recipe.refresh_from_db()
+        for field in (recipe.image_thumbnail, recipe.image_medium):
+            with field.open("rb") as f, Image.open(f) as derivative:
+                self.assertEqual(derivative.size, (100, 200))
@@ -1,6 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from backend.async_views import use_async_views
 from .views import IngredientViewSet, RecipeViewSet, TagViewSet
 
 router_v1 = DefaultRouter()
@@ -9,7 +10,15 @@ router_v1.register("ingredients", IngredientViewSet)
 router_v1.register("recipes", RecipeViewSet)
 router_v1.register("tags", TagViewSet)
 
+ASYNC_ROUTES = {
+    "ingredient-list",
+    "ingredient-detail",
+    "recipe-list",
+    "recipe-detail",
+    "tag-list",
+    "tag-detail",
+}
 
 urlpatterns = [
-    path("", include(router_v1.urls)),
+    path("", include(use_async_views(router_v1.urls, ASYNC_ROUTES))),
 ]
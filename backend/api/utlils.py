@@ -1,15 +1,38 @@
-from .models import Ingredient, IngredientAmount
+from .models import IngredientAmount
 
 
 def ingredient_creaton(recipe, ingredients):
-    amounts_instance = []
-    for ingredient_data in ingredients:
-        amount = ingredient_data["amount"]
-        amounts_instance.append(
-            IngredientAmount(
-                amount=amount,
-                recipe=recipe,
-                ingredient=Ingredient.objects.get(pk=ingredient_data["id"]),
-            )
+    return IngredientAmount.objects.bulk_create(
+        IngredientAmount(
+            amount=ingredient_data["amount"],
+            recipe=recipe,
+            ingredient_id=ingredient_data["id"],
         )
-    return IngredientAmount.objects.bulk_create(amounts_instance)
+        for ingredient_data in ingredients
+    )
+
+
+def ingredient_update(recipe, ingredients):
+    amounts = {
+        amount.ingredient_id: amount
+        for amount in recipe.amount_ingredients.all()
+    }
+    new_amounts = {item["id"]: item["amount"] for item in ingredients}
+
+    changed = []
+    for ingredient_id, amount in new_amounts.items():
+        current = amounts.get(ingredient_id)
+        if current is not None and current.amount != amount:
+            current.amount = amount
+            changed.append(current)
+    if changed:
+        IngredientAmount.objects.bulk_update(changed, ["amount"])
+
+    removed = amounts.keys() - new_amounts.keys()
+    if removed:
+        recipe.amount_ingredients.filter(ingredient_id__in=removed).delete()
+
+    ingredient_creaton(
+        recipe,
+        [item for item in ingredients if item["id"] not in amounts],
+    )
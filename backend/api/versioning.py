@@ -0,0 +1,26 @@
+import uuid
+
+from django.core.cache import cache
+
+VERSION_KEY = "version:{name}"
+INGREDIENTS_VERSION = "ingredients"
+TAGS_VERSION = "tags"
+RECIPES_VERSION = "recipes"
+
+
+def get_version(name):
+    key = VERSION_KEY.format(name=name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*names):
+    # A fresh random token never collides with entries cached under an
+    # evicted one, so the version itself may be dropped from the cache.
+    cache.set_many(
+        {VERSION_KEY.format(name=name): uuid.uuid4().hex for name in names},
+        None,
+    )
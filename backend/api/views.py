@@ -1,37 +1,75 @@
-import io
-
-from django.db.models import Sum
-from django.http.response import FileResponse
-from fpdf import FPDF
-from rest_framework import status, viewsets
+from django.conf import settings
+from django.http.response import (
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from .facets import get_facets
 from .filters import IngredientFilter, RecipeFilter
-from .models import Ingredient, Recipe, Tag
+from .ingredient_index import ingredient_index
+from .models import Favorite, Ingredient, Recipe, ShoppingList, Tag
 from .paginations import Pagination
 from .permissions import IsAuthor
+from .recipe_lists import add_recipes, remove_recipes
+from .reference_cache import CachedReadMixin
 from .serializers import (
     IngredientSerializer,
     RecipeCreateUpdateSerializer,
     RecipeForListSerializer,
+    RecipeIdsSerializer,
     RecipeSerializer,
     TagSerializer,
 )
+from .shopping_list import (
+    DEFAULT_FORMAT,
+    FORMATS,
+    FormatParamNegotiation,
+    etag_matches,
+    get_cart_summary,
+    get_cart_version,
+    get_etag,
+    render_cached,
+)
+from .versioning import INGREDIENTS_VERSION, TAGS_VERSION
 
 
-class IngredientViewSet(viewsets.ModelViewSet):
+class IngredientViewSet(CachedReadMixin, viewsets.ModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = [AllowAny]
     filter_class = IngredientFilter
+    cache_name = INGREDIENTS_VERSION
+    throttle_scopes = {"list": "ingredient_search"}
+
+    def list(self, request, *args, **kwargs):
+        if "name" not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        return self.cached_response(request, self.autocomplete)
+
+    def autocomplete(self, request):
+        try:
+            limit = int(
+                request.query_params.get(
+                    "limit", settings.INGREDIENT_AUTOCOMPLETE_LIMIT
+                )
+            )
+        except ValueError:
+            limit = settings.INGREDIENT_AUTOCOMPLETE_LIMIT
+        limit = max(1, min(limit, settings.INGREDIENT_AUTOCOMPLETE_MAX_LIMIT))
+        return Response(
+            ingredient_index.search(request.query_params["name"], limit)
+        )
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(CachedReadMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [AllowAny]
+    cache_name = TAGS_VERSION
 
 
 class RecipeViewSet(viewsets.ModelViewSet):
@@ -47,6 +85,18 @@ class RecipeViewSet(viewsets.ModelViewSet):
         "destroy": [IsAuthor],
     }
     filter_class = RecipeFilter
+    throttle_scopes = {
+        "create": "recipe_write",
+        "update": "recipe_write",
+        "partial_update": "recipe_write",
+        "download_shopping_cart": "shopping_cart",
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            return queryset.for_read(self.request.user)
+        return queryset.with_user_flags(self.request.user)
 
     def get_serializer_class(self):
         if self.request.method in ("POST", "PUT", "PATCH"):
@@ -54,66 +104,138 @@ class RecipeViewSet(viewsets.ModelViewSet):
         else:
             return RecipeSerializer
 
+    @action(detail=False, methods=["get"], permission_classes=(AllowAny,))
+    def facets(self, request):
+        return Response(get_facets(self.get_queryset(), request))
+
     @action(
         detail=False,
         methods=["get"],
         url_path="download_shopping_cart",
         url_name="download_shopping_cart",
+        permission_classes=(IsAuthenticated,),
+        content_negotiation_class=FormatParamNegotiation,
     )
     def download_shopping_cart(self, request):
-        ingredients_amounts = (
-            Recipe.objects.filter(shopping_list__user=request.user)
-            .order_by("ingredients__name")
-            .values("ingredients__name", "ingredients__measurement_unit")
-            .annotate(amount=Sum("amount_ingredients__amount"))
-        )
-
-        pdf = FPDF()
-        pdf.add_font(
-            "DejaVu", "", "./api/fonts/DejaVuSansCondensed.ttf", uni=True
-        )
-        pdf.set_font("DejaVu", "", 14)
-        pdf.add_page()
-        for item in ingredients_amounts:
-            name, amount, measurement_unit = (
-                item["ingredients__name"],
-                item["amount"],
-                item["ingredients__measurement_unit"],
+        file_format = request.query_params.get("format", DEFAULT_FORMAT)
+        if file_format not in FORMATS:
+            return Response(
+                {"format": f"Доступные форматы: {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            text = f"{name} ({measurement_unit}) - {amount}"
-
-            pdf.cell(0, 10, txt=text, ln=1)
-
-        string_file = pdf.output(dest="S")
-        response = FileResponse(
-            io.BytesIO(string_file.encode("latin1")),
-            content_type="application/pdf",
+        _, content_type = FORMATS[file_format]
+        version = get_cart_version(request.user.id)
+        etag = get_etag(version, file_format)
+        if etag_matches(etag, request.headers.get("If-None-Match")):
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
+        response = StreamingHttpResponse(
+            render_cached(request.user, version, file_format),
+            content_type=content_type,
         )
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
         response[
             "Content-Disposition"
-        ] = 'attachment; filename="shopong-list.pdf"'
+        ] = f'attachment; filename="shopping-list.{file_format}"'
 
         return response
 
-    def favorite_and_shopping(self, related):
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="shopping_cart_summary",
+        url_name="shopping_cart_summary",
+        permission_classes=(IsAuthenticated,),
+    )
+    def shopping_cart_summary(self, request):
+        version = get_cart_version(request.user.id)
+        etag = get_etag(version, "json")
+        if etag_matches(etag, request.headers.get("If-None-Match")):
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
+        response = Response(
+            {"ingredients": get_cart_summary(request.user, version)}
+        )
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def favorite_and_shopping(self, model):
         recipe = self.get_object()
         if self.request.method == "DELETE":
-            related.objects.get(recipe_id=recipe.id).delete()
+            deleted, _ = model.objects.filter(
+                user=self.request.user, recipe=recipe
+            ).delete()
+            if not deleted:
+                return Response(
+                    {"errors": "Рецепта нет в списке"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
             return Response(status=status.HTTP_204_NO_CONTENT)
-        if related.objects.filter(recipe=recipe).exist():
-            raise validators.ValidationError('Уже существует')
-        related.objects.create(recipe=recipe)
-        serializer = RecipeForListSerializer(instance=recipe)
+        _, created = model.objects.get_or_create(
+            user=self.request.user, recipe=recipe
+        )
+        if not created:
+            return Response(
+                {"errors": "Уже существует"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = RecipeForListSerializer(
+            instance=recipe, context=self.get_serializer_context()
+        )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def bulk_favorite_and_shopping(self, model):
+        serializer = RecipeIdsSerializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        statuses = add_recipes(
+            model, self.request.user, serializer.validated_data["add"]
+        )
+        statuses.update(
+            remove_recipes(
+                model, self.request.user, serializer.validated_data["remove"]
+            )
+        )
+        return Response(
+            {
+                "results": [
+                    {"id": recipe_id, "status": recipe_status}
+                    for recipe_id, recipe_status in statuses.items()
+                ]
+            }
+        )
+
     @action(detail=True, methods=['get', 'delete'],
             permission_classes=(permissions.IsAuthenticated,),
             name='favorite')
     def favorite(self, request, pk=None):
-        return self.favorite_and_shopping(request.user.favorites_recipes)
+        return self.favorite_and_shopping(Favorite)
 
     @action(detail=True, methods=['get', 'delete'],
             permission_classes=(permissions.IsAuthenticated,),
             name='shopping_cart')
     def shopping_cart(self, request, pk=None):
-        return self.favorite_and_shopping(request.user.shopping_user)
+        return self.favorite_and_shopping(ShoppingList)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="favorite",
+        url_name="favorite_bulk",
+        permission_classes=(IsAuthenticated,),
+    )
+    def favorite_bulk(self, request):
+        return self.bulk_favorite_and_shopping(Favorite)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="shopping_cart",
+        url_name="shopping_cart_bulk",
+        permission_classes=(IsAuthenticated,),
+    )
+    def shopping_cart_bulk(self, request):
+        return self.bulk_favorite_and_shopping(ShoppingList)
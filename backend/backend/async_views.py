@@ -0,0 +1,54 @@
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from .db import check_connections
+from .metrics import track_queries
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_VIEW_THREADS,
+    thread_name_prefix="async-views",
+)
+
+
+def _call(view, request, *args, **kwargs):
+    # Pool threads outlive requests, so they manage their own connections
+    # the way the request_started/request_finished signals do.
+    close_old_connections()
+    check_connections()
+    try:
+        with track_queries():
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render") and not response.is_rendered:
+                response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """Turn a sync view into a coroutine running on the bounded pool.
+
+    Django 3.2 has no async ORM, so the view body still runs in a thread,
+    but the event loop stays free for slow clients and the number of
+    concurrent queries per worker is capped by ASYNC_VIEW_THREADS.
+    """
+    run = sync_to_async(_call, thread_sensitive=False, executor=_executor)
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run(view, request, *args, **kwargs)
+
+    return wrapper
+
+
+def use_async_views(urlpatterns, names):
+    if not settings.ASYNC_READ_VIEWS:
+        return urlpatterns
+    for pattern in urlpatterns:
+        if pattern.name in names:
+            pattern.callback = async_view(pattern.callback)
+    return urlpatterns
@@ -0,0 +1,37 @@
+from django.core.signals import request_started
+from django.db import connections
+from django.dispatch import receiver
+
+
+def _check_before_first_query(connection):
+    ensure_connection = connection.ensure_connection
+
+    def checked_ensure_connection():
+        # Restores the class method first, so only the first query of the
+        # request pays for the ping.
+        del connection.ensure_connection
+        if (
+            connection.connection is not None
+            and not connection.in_atomic_block
+            and not connection.is_usable()
+        ):
+            connection.close()
+        ensure_connection()
+
+    connection.ensure_connection = checked_ensure_connection
+
+
+@receiver(request_started)
+def check_connections(**kwargs):
+    # Backport of Django 4.1 CONN_HEALTH_CHECKS: a persistent connection
+    # the server or pgbouncer dropped while idle would otherwise fail the
+    # first query of the request instead of being reopened. As in 4.1 the
+    # check waits for that first query, so requests answered from the
+    # cache (304s, throttled, cached tokens) skip the round-trip.
+    for connection in connections.all():
+        if (
+            connection.connection is not None
+            and connection.settings_dict.get("CONN_HEALTH_CHECKS")
+            and "ensure_connection" not in vars(connection)
+        ):
+            _check_before_first_query(connection)
@@ -0,0 +1,180 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .throttling import throttle_rejections
+
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+_patched = False
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.label = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+class Histogram:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, label, total, metrics):
+        with self._lock:
+            stats = self._endpoints.setdefault(
+                label,
+                {
+                    "count": 0,
+                    "queries": 0,
+                    "db_ms": 0.0,
+                    "serializer_ms": 0.0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "buckets": [0] * (len(BUCKETS_MS) + 1),
+                },
+            )
+            total_ms = total * 1000
+            stats["count"] += 1
+            stats["queries"] += metrics.queries
+            stats["db_ms"] += metrics.db_time * 1000
+            stats["serializer_ms"] += metrics.serializer_time * 1000
+            stats["total_ms"] += total_ms
+            stats["max_ms"] = max(stats["max_ms"], total_ms)
+            stats["buckets"][bisect.bisect_left(BUCKETS_MS, total_ms)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {
+                label: dict(stats, buckets=list(stats["buckets"]))
+                for label, stats in self._endpoints.items()
+            }
+        return {
+            "buckets_ms": list(BUCKETS_MS) + ["+Inf"],
+            "endpoints": endpoints,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+histogram = Histogram()
+
+
+def _timed_data(data):
+    # Wraps BaseSerializer.data: only top-level serializers go through it,
+    # nested ones are rendered by their parent's to_representation.
+    def getter(serializer):
+        metrics = _current.get()
+        if metrics is None:
+            return data.fget(serializer)
+        metrics.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            metrics.serializer_depth -= 1
+            if not metrics.serializer_depth:
+                metrics.serializer_time += time.perf_counter() - started
+
+    return property(getter)
+
+
+@contextmanager
+def track_queries():
+    # Counts the queries of the current thread's connections into the
+    # request's metrics. The middleware covers the request thread; views
+    # running on other threads (backend.async_views) enter it there, with
+    # the metrics carried over in the copied context.
+    metrics = _current.get()
+    with ExitStack() as stack:
+        if metrics is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+        yield
+
+
+def view_label(view_func):
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return f"{view_func.__module__}.{view_func.__name__}"
+    return view_class.__name__
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        global _patched
+        if not _patched:
+            serializers.BaseSerializer.data = _timed_data(
+                serializers.BaseSerializer.data
+            )
+            _patched = True
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with track_queries():
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        response["Server-Timing"] = ", ".join(
+            (
+                f'db;dur={metrics.db_time * 1000:.1f};'
+                f'desc="{metrics.queries} queries"',
+                f"serializer;dur={metrics.serializer_time * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}",
+            )
+        )
+        if metrics.label is not None:
+            histogram.record(metrics.label, total, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        actions = getattr(view_func, "actions", None) or {}
+        action = actions.get(request.method.lower(), request.method.lower())
+        metrics.label = f"{view_label(view_func)}.{action}"
+
+
+class MetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        snapshot = histogram.snapshot()
+        snapshot["throttled"] = throttle_rejections.snapshot()
+        return Response(snapshot)
+
+    def delete(self, request):
+        histogram.reset()
+        throttle_rejections.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
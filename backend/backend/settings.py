@@ -28,6 +28,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,6 +38,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'False') == 'True'
+
+# "asgi" serves the app with uvicorn workers, see gunicorn.conf.py.
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+ASYNC_READ_VIEWS = SERVER_MODE == 'asgi'
+ASYNC_VIEW_THREADS = int(os.getenv('ASYNC_VIEW_THREADS', 8))
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -65,20 +73,96 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        # Seconds a connection is reused across requests, 0 closes it after
+        # every request.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        # Pings a reused connection before the first query of a request,
+        # see backend.db.check_connections.
+        'CONN_HEALTH_CHECKS': (
+            os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+        ),
+        # Behind pgbouncer in transaction pooling mode (infra/
+        # docker-compose.pgbouncer.yml) consecutive transactions of one
+        # Django connection may run on different server connections:
+        # - safe: ordinary queries, transaction.atomic() blocks,
+        #   select_for_update() inside them, bulk operations and temporary
+        #   tables created with ON COMMIT DROP (load_data --copy);
+        # - needs DB_DISABLE_SERVER_SIDE_CURSORS=True: QuerySet.iterator(),
+        #   whose named cursors outlive the transaction that opened them;
+        # - unsafe: session state outside a transaction such as SET,
+        #   advisory locks, LISTEN/NOTIFY and prepared statements, and
+        #   migrations, which should connect to Postgres directly.
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', 'False') == 'True'
+        ),
+    }
+}
+
+# Cart, catalog and facet versions, cached responses and token lookups are
+# invalidated through this cache, so every process serving requests must
+# share it: infra/docker-compose.yml runs memcached. The LocMemCache default
+# is per process and only fits a single one, see gunicorn.conf.py.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'foodgram'),
     }
 }
+if CACHES['default']['BACKEND'].endswith('.LocMemCache'):
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 1000)),
+    }
+
+SHOPPING_LIST_CACHE_TIMEOUT = int(
+    os.getenv('SHOPPING_LIST_CACHE_TIMEOUT', 60 * 60)
+)
+
+INGREDIENT_INDEX_MAX_SIZE = int(os.getenv('INGREDIENT_INDEX_MAX_SIZE', 50000))
+INGREDIENT_AUTOCOMPLETE_LIMIT = int(
+    os.getenv('INGREDIENT_AUTOCOMPLETE_LIMIT', 20)
+)
+INGREDIENT_AUTOCOMPLETE_MAX_LIMIT = 100
+
+REFERENCE_CACHE_TIMEOUT = int(os.getenv('REFERENCE_CACHE_TIMEOUT', 60 * 60))
+REFERENCE_CACHE_MAX_AGE = int(os.getenv('REFERENCE_CACHE_MAX_AGE', 60))
+
+RECIPE_FACETS_CACHE_TIMEOUT = int(
+    os.getenv('RECIPE_FACETS_CACHE_TIMEOUT', 10 * 60)
+)
+
+# Token lookups are cached only with a shared CACHE_BACKEND, see
+# users/authentication.py.
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.getenv('AUTH_TOKEN_CACHE_TIMEOUT', 5 * 60))
 
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend"
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'backend.throttling.ScopedTokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'shopping_cart': os.getenv('THROTTLE_SHOPPING_CART', '30/min'),
+        'recipe_write': os.getenv('THROTTLE_RECIPE_WRITE', '20/min'),
+        'ingredient_search': os.getenv('THROTTLE_INGREDIENT_SEARCH', '300/min'),
+    },
 }
 
+# 'backend.throttling.LocalMemoryBucketStore' keeps buckets per process;
+# 'backend.throttling.CacheBucketStore' shares them through THROTTLE_CACHE,
+# which should then be a Redis or Memcached cache common to all nodes.
+THROTTLE_BUCKET_STORE = os.getenv(
+    'THROTTLE_BUCKET_STORE', 'backend.throttling.LocalMemoryBucketStore'
+)
+THROTTLE_CACHE = os.getenv('THROTTLE_CACHE', 'default')
+
 DJOSER = {
     'LOGIN_FIELD': 'email',
     'SERIALIZERS': {
@@ -128,4 +212,8 @@ STATIC_ROOT = os.path.join(BASE_DIR, '/var/html/static/')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, "/var/html/media/")
 
+RECIPE_IMAGE_MAX_SIZE = int(os.getenv('RECIPE_IMAGE_MAX_SIZE', 10 * 1024 * 1024))
+RECIPE_IMAGE_MAX_DIMENSION = int(os.getenv('RECIPE_IMAGE_MAX_DIMENSION', 6000))
+IMAGE_DERIVATIVE_WORKERS = int(os.getenv('IMAGE_DERIVATIVE_WORKERS', 2))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
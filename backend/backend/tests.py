@@ -0,0 +1,28 @@
+import re
+
+from django.test import TestCase, override_settings
+from django.test.client import AsyncClient
+from django.urls import path
+
+from api.views import RecipeViewSet
+from .async_views import async_view
+
+urlpatterns = [
+    path(
+        "api/recipes/",
+        async_view(RecipeViewSet.as_view({"get": "list"})),
+    ),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__, REQUEST_METRICS_ENABLED=True)
+class AsyncViewMetricsTests(TestCase):
+    async def test_pool_thread_queries_are_counted(self):
+        response = await AsyncClient().get("/api/recipes/")
+        self.assertEqual(response.status_code, 200)
+        # The view's queries run on a pool thread connection, not on the
+        # request thread wrapped by RequestMetricsMiddleware.
+        queries = re.search(
+            r'db;dur=[\d.]+;desc="(\d+) queries"', response["Server-Timing"]
+        )
+        self.assertGreater(int(queries.group(1)), 0)
@@ -0,0 +1,134 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+BUCKET_KEY = "throttle:{scope}:{ident}"
+
+
+class Counter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def increment(self, label):
+        with self._lock:
+            self._counts[label] = self._counts.get(label, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+# Rejected requests per scope, reported by backend.metrics.MetricsView;
+# counted even when the request metrics middleware is disabled.
+throttle_rejections = Counter()
+
+
+def parse_rate(rate):
+    """Turn "30/min" into a bucket of 30 tokens refilled at 0.5/s."""
+    count, period = rate.split("/")
+    capacity = int(count)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+class LocalMemoryBucketStore:
+    """Buckets in this process only: exact, but per gunicorn worker."""
+
+    max_entries = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def consume(self, key, capacity, refill_rate):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            if len(self._buckets) >= self.max_entries:
+                # Forgetting a bucket only ever refills it.
+                self._buckets.clear()
+            self._buckets[key] = (tokens, now)
+        return allowed, (1 - tokens) / refill_rate
+
+
+class CacheBucketStore:
+    """Buckets in a Django cache shared by every node, e.g. Redis.
+
+    The read-modify-write is not atomic, so concurrent requests of one
+    client may each spend the same token: a limit may be exceeded by the
+    number of requests that race, never by more.
+    """
+
+    def __init__(self, alias=None):
+        self.cache = caches[alias or settings.THROTTLE_CACHE]
+
+    def consume(self, key, capacity, refill_rate):
+        now = time.time()
+        tokens, updated = self.cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + max(now - updated, 0) * refill_rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Once full again the bucket is the same as a missing one.
+        timeout = math.ceil((capacity - tokens) / refill_rate) + 1
+        self.cache.set(key, (tokens, now), timeout)
+        return allowed, (1 - tokens) / refill_rate
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_bucket_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = import_string(settings.THROTTLE_BUCKET_STORE)()
+    return _store
+
+
+class ScopedTokenBucketThrottle(BaseThrottle):
+    """Per-user token bucket for views that declare a throttle scope.
+
+    The scope comes from ``throttle_scopes[view.action]`` or
+    ``throttle_scope`` on the view, and its rate from
+    DEFAULT_THROTTLE_RATES. Anonymous clients are keyed by address.
+    """
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scopes", {}).get(
+            getattr(view, "action", None),
+            getattr(view, "throttle_scope", None),
+        )
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        capacity, refill_rate = parse_rate(rate)
+        allowed, self._wait = get_bucket_store().consume(
+            BUCKET_KEY.format(scope=scope, ident=ident), capacity, refill_rate
+        )
+        if not allowed:
+            throttle_rejections.increment(scope)
+        return allowed
+
+    def wait(self):
+        return self._wait
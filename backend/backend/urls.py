@@ -2,8 +2,11 @@ from django.contrib import admin
 from django.urls import path
 from django.urls.conf import include
 
+from .metrics import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/metrics/', MetricsView.as_view()),
     path('api/', include('users.urls')),
     path('api/', include('api.urls'))
 ]
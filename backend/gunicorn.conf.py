@@ -0,0 +1,29 @@
+import multiprocessing
+import os
+
+# Invalidations go through the Django cache: the per-process LocMemCache
+# (the default without CACHE_BACKEND) is only correct in a single worker.
+LOCAL_CACHE = os.getenv(
+    "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+).endswith(".LocMemCache")
+
+bind = "0.0.0.0:8000"
+workers = int(
+    os.getenv(
+        "GUNICORN_WORKERS",
+        1 if LOCAL_CACHE else multiprocessing.cpu_count() + 1,
+    )
+)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+
+if LOCAL_CACHE and workers > 1:
+    raise RuntimeError(
+        f"GUNICORN_WORKERS={workers} needs a cache shared by the workers; "
+        "set CACHE_BACKEND and CACHE_LOCATION (see infra/docker-compose.yml)"
+    )
+
+if os.getenv("SERVER_MODE", "wsgi") == "asgi":
+    wsgi_app = "backend.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "backend.wsgi:application"
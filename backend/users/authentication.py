@@ -0,0 +1,47 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.authentication import TokenAuthentication
+
+TOKEN_KEY = "auth-token:{digest}"
+
+
+def token_cache_key(key):
+    # The raw token never leaves the database, only its digest does.
+    return TOKEN_KEY.format(digest=hashlib.sha256(key.encode()).hexdigest())
+
+
+def caches_tokens():
+    # Logout and deactivation drop the entry only from the cache of the
+    # process handling them: with a per-process cache the token would keep
+    # working in every other gunicorn worker until the entry expires.
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache)
+
+
+def forget_tokens(*keys):
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that keeps the token with its user in the cache.
+
+    Only successful lookups are cached, and users/signals.py drops the
+    entry on logout, password change and deactivation. Caching is skipped
+    unless the default cache is shared by all processes (memcached).
+
+    The cached user may be up to AUTH_TOKEN_CACHE_TIMEOUT seconds old; its
+    save() leaves the counter columns alone (users.models.CounterFieldsMixin)
+    and every other change to the user goes through save() and drops it.
+    """
+
+    def authenticate_credentials(self, key):
+        if not caches_tokens():
+            return super().authenticate_credentials(key)
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, token, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+        return token.user, token
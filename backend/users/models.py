@@ -2,12 +2,47 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 
-class User(AbstractUser):
+class CounterFieldsMixin:
+    """Leave the counter columns out of full-row saves of existing rows.
+
+    The counters are changed with F() updates from the signal receivers;
+    a save() of an instance loaded before such an update would put the
+    old value back.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            not args
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+            and not self._state.adding
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class User(CounterFieldsMixin, AbstractUser):
     email = models.EmailField(("email address"), blank=False, unique=True)
     username = models.CharField(max_length=150, unique=True)
     first_name = models.CharField(max_length=150)
     last_name = models.CharField(max_length=150)
     password = models.CharField(max_length=150)
+    recipes_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Рецептов"
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Подписчиков"
+    )
+    counter_fields = ("recipes_count", "followers_count")
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = [
         "username",
@@ -2,6 +2,7 @@ from djoser.serializers import UserSerializer
 from rest_framework import serializers
 
 from .models import Follow, User
+from .utils import get_recipes_limit
 
 
 class CustomUserSerializer(serializers.ModelSerializer):
@@ -20,21 +21,30 @@ class CustomUserSerializer(serializers.ModelSerializer):
             "is_subscribed",
             "recipes",
             "recipes_count",
+            "followers_count",
         )
 
     def get_is_subscribed(self, user_object):
+        if hasattr(user_object, "subscribed"):
+            return user_object.subscribed
         return Follow.objects.filter(
             user=self.context["request"].user.id, follower=user_object.id
         ).exists()
 
     def get_recipes_count(self, user_object):
-        return user_object.recipes.all().count()
+        return user_object.recipes_count
 
     def get_recipes(self, user_object):
         from api.serializers import RecipeForListSerializer
 
+        recipes = user_object.recipes.all()
+        limit = get_recipes_limit(self.context["request"])
+        if limit is None:
+            limit = self.context.get("recipes_limit")
+        if limit is not None:
+            recipes = recipes[:limit]
         return RecipeForListSerializer(
-            user_object.recipes.all(), read_only=True, many=True
+            recipes, read_only=True, many=True, context=self.context
         ).data
 
 
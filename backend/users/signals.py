@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import caches_tokens, forget_tokens
+from .models import Follow, User
+from .utils import change_counter
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(
+            User.objects.filter(pk=instance.follower_id), "followers_count", 1
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    change_counter(
+        User.objects.filter(pk=instance.follower_id), "followers_count", -1
+    )
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    forget_tokens(instance.key)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    # Password changes and deactivation go through save(), and the cached
+    # token carries the user as it was when it was cached.
+    if not created and caches_tokens():
+        forget_tokens(
+            *Token.objects.filter(user=instance).values_list("key", flat=True)
+        )
@@ -0,0 +1,74 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import Recipe
+from .models import Follow, User
+
+
+class FollowingAPITests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="reader@example.com",
+            username="reader",
+            first_name="Reader",
+            last_name="Reader",
+            password="password",
+        )
+        cls.author = User.objects.create_user(
+            email="author@example.com",
+            username="author",
+            first_name="Author",
+            last_name="Author",
+            password="password",
+        )
+        for number in range(5):
+            Recipe.objects.create(
+                author=cls.author,
+                name=f"Recipe {number}",
+                image="recipes/recipe.png",
+                text="Text",
+                cooking_time=10,
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.url = f"/api/users/{self.author.id}/subscribe/"
+
+    def test_follow_query_count(self):
+        # The author, SAVEPOINT, INSERT, followers_count, RELEASE and the
+        # recipe preview; the savepoint pair comes from the test
+        # transaction around the view's atomic block.
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["recipes"]), 3)
+        self.assertEqual(response.data["followers_count"], 1)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 1)
+
+    def test_follow_twice(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 1)
+
+    def test_unfollow_query_count(self):
+        Follow.objects.create(user=self.user, follower=self.author)
+        with self.assertNumQueries(3):
+            response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Follow.objects.exists())
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 0)
+
+    def test_unfollow_without_subscription(self):
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_subscriptions_show_followers_count(self):
+        Follow.objects.create(user=self.user, follower=self.author)
+        response = self.client.get("/api/users/subscriptions/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["followers_count"], 1)
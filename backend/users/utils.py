@@ -0,0 +1,28 @@
+from django.db.models import BooleanField, Exists, F, OuterRef, Value
+from django.db.models.functions import Greatest
+
+from .models import Follow
+
+
+def annotate_subscribed(queryset, user):
+    if user.is_anonymous:
+        return queryset.annotate(
+            subscribed=Value(False, output_field=BooleanField())
+        )
+    return queryset.annotate(
+        subscribed=Exists(
+            Follow.objects.filter(user=user, follower=OuterRef("pk"))
+        )
+    )
+
+
+def get_recipes_limit(request):
+    try:
+        limit = int(request.query_params["recipes_limit"])
+    except (KeyError, ValueError):
+        return None
+    return max(limit, 0)
+
+
+def change_counter(queryset, field, delta):
+    queryset.update(**{field: Greatest(F(field) + delta, 0)})
@@ -1,17 +1,29 @@
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_list_or_404, get_object_or_404
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    BooleanField,
+    OuterRef,
+    Prefetch,
+    Subquery,
+    Value,
+)
+from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet
 from rest_framework import mixins, status, viewsets
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api.models import Recipe
 from users.serializers import CustomUserSerializer
 from .models import Follow
 from .paginations import DefaultPagination, UserPagination
+from .utils import get_recipes_limit
 
 User = get_user_model()
 
+FOLLOW_RECIPES_PREVIEW = 3
+
 
 class CustomUserViewSet(UserViewSet):
     serializer_class = CustomUserSerializer
@@ -20,46 +32,73 @@ class CustomUserViewSet(UserViewSet):
 
 
 class FollowingAPI(APIView):
+    permission_classes = [IsAuthenticated]
+
     def get(self, request, id):
-        if request.user == get_object_or_404(User, id=id):
+        # Four queries: the author, the INSERT (its unique constraint is
+        # the duplicate check), the followers_count update from
+        # users/signals.py and the LIMITed recipe preview.
+        if request.user.id == id:
             return Response(
                 {"errors": "Unable to subscribe to yourself"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        follower = User.objects.get(id=id)
-        serializer = CustomUserSerializer(
-            follower, context={"request": self.request}
-        )
-        if not Follow.objects.filter(
-            user=request.user, follower=follower
-        ).exists():
-            Follow.objects.create(user=request.user, follower=follower)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        else:
+        follower = get_object_or_404(User, id=id)
+        try:
+            with transaction.atomic():
+                Follow.objects.create(user=request.user, follower=follower)
+        except IntegrityError:
             return Response(
                 {"errors": "You are already subscribed to the user"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        follower.subscribed = True
+        # Mirrors the UPDATE made by users/signals.follow_created.
+        follower.followers_count += 1
+        serializer = CustomUserSerializer(
+            follower,
+            context={
+                "request": request,
+                "recipes_limit": FOLLOW_RECIPES_PREVIEW,
+            },
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def delete(self, request, id):
-        follower = User.objects.get(id=id)
-        if Follow.objects.filter(
-            user=request.user, follower=follower
-        ).exists():
-            Follow.objects.get(user=request.user, follower=follower).delete()
+        # Three queries: the subscription row, its DELETE and the
+        # followers_count update from users/signals.py. The deleted count
+        # tells whether the subscription existed.
+        deleted, _ = Follow.objects.filter(
+            user=request.user, follower_id=id
+        ).delete()
+        if deleted:
             return Response(status=status.HTTP_204_NO_CONTENT)
-        else:
-            return Response(
-                {"errors": "You are not subscribed on this user"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        get_object_or_404(User, id=id)
+        return Response(
+            {"errors": "You are not subscribed on this user"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
 
 class FollowsListViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     serializer_class = CustomUserSerializer
     pagination_class = DefaultPagination
+    permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        follow_objects = get_list_or_404(Follow, user=self.request.user)
-        subscriptions = [object_.follower for object_ in follow_objects]
-        return subscriptions
+        recipes = Recipe.objects.all()
+        limit = get_recipes_limit(self.request)
+        if limit is not None:
+            recipes = recipes.filter(
+                pk__in=Subquery(
+                    Recipe.objects.filter(author=OuterRef("author"))
+                    .order_by("-pub_date")
+                    .values("pk")[:limit]
+                )
+            )
+        return (
+            User.objects.filter(is_subscribed__user=self.request.user)
+            .annotate(subscribed=Value(True, output_field=BooleanField()))
+            .prefetch_related(Prefetch("recipes", queryset=recipes))
+            .order_by("is_subscribed__id")
+        )